@@ -13,7 +13,7 @@ engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
 
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
-    # Lightweight SQLite migration: add viability columns if missing
+    # Lightweight SQLite migration: add columns introduced after the first release if missing
     try:
         with engine.connect() as conn:
             res = conn.exec_driver_sql("PRAGMA table_info(project)")
@@ -25,11 +25,30 @@ def init_db() -> None:
                 alters.append("ALTER TABLE project ADD COLUMN viability_score REAL")
             if "viability_reason" not in cols:
                 alters.append("ALTER TABLE project ADD COLUMN viability_reason TEXT")
+            if "batch_id" not in cols:
+                alters.append("ALTER TABLE project ADD COLUMN batch_id INTEGER REFERENCES batch(id)")
+                alters.append("CREATE INDEX IF NOT EXISTS ix_project_batch_id ON project (batch_id)")
+            res = conn.exec_driver_sql("PRAGMA table_info(artifact)")
+            if "rel_path" not in {row[1] for row in res.fetchall()}:  # type: ignore[index]
+                alters.append("ALTER TABLE artifact ADD COLUMN rel_path TEXT")
             for stmt in alters:
                 conn.exec_driver_sql(stmt)
+            conn.commit()
     except Exception:
         # Best-effort; ignore in environments that aren't SQLite
         pass
+    if engine.dialect.name == "sqlite":
+        # Full-text index for /api/projects/search (app/services/search.py); rowid = project.id
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS project_fts USING fts5("
+                    "title, transcript, spec, tokenize = 'porter unicode61 remove_diacritics 2')"
+                )
+                conn.commit()
+        except Exception:
+            # SQLite built without FTS5: search reports itself unavailable
+            pass
 
 
 def get_session() -> Generator[Session, None, None]:
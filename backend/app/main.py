@@ -1,36 +1,72 @@
+import contextvars
+import json
+import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from fastapi import BackgroundTasks, Depends, FastAPI, File, HTTPException, UploadFile
+import anyio
+from fastapi import BackgroundTasks, Depends, FastAPI, File, Header, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from sqlmodel import Session, select
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlmodel import Session, func, select
+from starlette.background import BackgroundTask
 
-from dotenv import load_dotenv, find_dotenv
-# Ensure .env is loaded regardless of working directory
-load_dotenv(find_dotenv(), override=False)
+from dotenv import load_dotenv
+# Ensure .env is loaded regardless of working directory. The path is explicit
+# (backend/.env, or DOTENV_PATH) rather than find_dotenv(), which walks the filesystem.
+load_dotenv(os.getenv("DOTENV_PATH") or Path(__file__).resolve().parent.parent / ".env", override=False)
 
 from .database import init_db, get_session
-from .models import Artifact, Project
-from .schemas import ArtifactRead, ProjectCreate, ProjectRead
+from .models import Artifact, Batch, Project
+from .responses import CompressedStaticFiles, FastJSONResponse, NegotiatedGZipMiddleware
+from .schemas import ArtifactRead, BatchRead, ProjectBulkCreate, ProjectCreate, ProjectRead, ProjectSearchResults
 from .services.pipeline import (
     captions_or_transcribe,
     analyze_to_spec,
     ensure_dir,
+    expand_playlist,
+    extract_youtube_id,
     generate_prototype_zip,
+    prewarm,
 )
+from .services import admission, profiling, search
+from .services.pipeline_log import PipelineLogger, flush_logger, follow, get_logger, read_tail
+from .services.dedupe import DEDUPE_REUSE_ZIP, find_duplicate, remember as remember_signature
+from .services.storage import UNATTACHED_ID, LocalStorage, collect_garbage, enforce_quota
 from .services.viability import check_viability
 from .routes import stripe as stripe_routes
 
 
 ARTIFACTS_DIR = Path(os.getenv("ARTIFACTS_DIR", "artifacts"))
 BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://localhost:8000")
+LOG_FOLLOW_TIMEOUT = float(os.getenv("LOG_FOLLOW_TIMEOUT", "600"))
+LOG_MAX_FOLLOWERS = int(os.getenv("LOG_MAX_FOLLOWERS", "32"))
+_log_followers = threading.BoundedSemaphore(LOG_MAX_FOLLOWERS)
+ARTIFACT_GC_INTERVAL = float(os.getenv("ARTIFACT_GC_INTERVAL", "3600"))
+# Hard ceiling per batch; admission control also caps a batch at the client plan's burst
+# (RATE_LIMIT_<PLAN>) and at MAX_PENDING_PIPELINES, whichever is smallest
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "500"))
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "2"))
+
+log = logging.getLogger(__name__)
 
 ensure_dir(ARTIFACTS_DIR)
+storage = LocalStorage(ARTIFACTS_DIR)
+
+
+def _profiles_dir(project_id: Optional[int]) -> Path:
+    return storage.project_dir(project_id if project_id is not None else UNATTACHED_ID) / profiling.PROFILES_DIR
+
 
 app = FastAPI(title="YouTube → MVP API")
+if profiling.ADMIN_TOKEN:
+    # Sync endpoints' threadpool workers join the profile of the request they serve
+    app.router.route_class = profiling.ProfiledRoute
 
 allowed = os.getenv("ALLOWED_ORIGINS", "*")
 origins = [o.strip() for o in allowed.split(",") if o.strip()] if allowed != "*" else ["*"]
@@ -41,35 +77,121 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# JSON listings compress well; already-encoded downloads and zips are skipped by the middleware
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")), compresslevel=6)
+if profiling.ADMIN_TOKEN:
+    # Outermost, so a profile covers compression and every other middleware too
+    app.add_middleware(profiling.ProfilingMiddleware, profiles_dir=_profiles_dir)
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     init_db()
-    app.mount("/downloads", StaticFiles(directory=str(ARTIFACTS_DIR)), name="downloads")
+    app.mount("/downloads", CompressedStaticFiles(directory=str(ARTIFACTS_DIR), hidden=[profiling.PROFILES_DIR]), name="downloads")
     app.include_router(stripe_routes.router)
+    if os.getenv("PREWARM_PIPELINE", "").lower() in ("1", "true", "yes"):
+        # Workers that run pipelines import the heavy deps off the request path
+        threading.Thread(target=_prewarm, name="pipeline-prewarm", daemon=True).start()
+    if ARTIFACT_GC_INTERVAL > 0:
+        threading.Thread(target=_gc_loop, name="artifact-gc", daemon=True).start()
 
 
-def project_artifacts_urls(project: Project, session: Session) -> List[ArtifactRead]:
-    results = session.exec(select(Artifact).where(Artifact.project_id == project.id)).all()
-    items: List[ArtifactRead] = []
-    for a in results:
-        rel = Path(a.path).relative_to(ARTIFACTS_DIR)
-        url = f"{BACKEND_BASE_URL}/downloads/{rel.as_posix()}"
-        items.append(
-            ArtifactRead(id=a.id, type=a.type, url=url, created_at=a.created_at)  # type: ignore[arg-type]
-        )
+def _prewarm() -> None:
+    timings = prewarm()
+    log.info("pipeline prewarm: %s", ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+
+
+def _gc_loop() -> None:
+    from .database import engine as _engine
+    while True:
+        time.sleep(ARTIFACT_GC_INTERVAL)
+        try:
+            with Session(_engine) as session:
+                stats = collect_garbage(storage, session)
+            if any(stats.values()):
+                log.info("artifact gc: %s", ", ".join(f"{k}={v}" for k, v in stats.items()))
+        except Exception:
+            log.exception("artifact gc failed")
+
+
+_DOWNLOADS_URL = f"{BACKEND_BASE_URL}/downloads/"
+
+# Columns needed to build a ProjectRead; selecting them directly skips ORM object construction
+PROJECT_READ_COLUMNS = (
+    Project.id,
+    Project.youtube_url,
+    Project.title,
+    Project.status,
+    Project.mvp_viability,
+    Project.viability_score,
+    Project.viability_reason,
+    Project.transcript_path,
+    Project.spec_path,
+    Project.prototype_zip_path,
+    Project.created_at,
+    Project.updated_at,
+)
+ARTIFACT_READ_COLUMNS = (Artifact.project_id, Artifact.id, Artifact.type, Artifact.path, Artifact.rel_path, Artifact.created_at)
+
+
+def load_artifacts(session: Session, project_ids: Optional[List[int]] = None) -> Dict[int, list]:
+    """Artifact rows grouped by project, in one query (all projects when ids is None)."""
+    stmt = select(*ARTIFACT_READ_COLUMNS).order_by(Artifact.id)
+    if project_ids is not None:
+        stmt = stmt.where(Artifact.project_id.in_(project_ids))  # type: ignore[attr-defined]
+    grouped: Dict[int, list] = {}
+    for row in session.exec(stmt):
+        grouped.setdefault(row.project_id, []).append(row)
+    return grouped
+
+
+def project_payload(p, artifacts=()) -> Dict:
+    """Project (ORM object or PROJECT_READ_COLUMNS row) → ProjectRead-shaped dict."""
+    items = [
+        {"id": a.id, "type": a.type, "url": _DOWNLOADS_URL + (a.rel_path or storage.relpath(a.path)), "created_at": a.created_at}
+        for a in artifacts
+    ]
     # Include implicit main artifacts from project fields if present
-    implicit = [("transcript", project.transcript_path), ("spec", project.spec_path), ("prototype_zip", project.prototype_zip_path)]
-    for t, p in implicit:
-        if p:
-            rel = Path(p).relative_to(ARTIFACTS_DIR)
-            url = f"{BACKEND_BASE_URL}/downloads/{rel.as_posix()}"
-            items.append(ArtifactRead(id=0, type=t, url=url, created_at=project.updated_at))
-    return items
+    for t, path in (("transcript", p.transcript_path), ("spec", p.spec_path), ("prototype_zip", p.prototype_zip_path)):
+        if path:
+            items.append({"id": 0, "type": t, "url": _DOWNLOADS_URL + storage.url_path(path), "created_at": p.updated_at})
+    return {
+        "id": p.id,
+        "youtube_url": p.youtube_url,
+        "title": p.title,
+        "status": p.status,
+        "mvp_viability": p.mvp_viability,
+        "viability_score": p.viability_score,
+        "viability_reason": p.viability_reason,
+        "artifacts": items,
+        "created_at": p.created_at,
+        "updated_at": p.updated_at,
+    }
+
+
+def project_artifacts_urls(project: Project, session: Session) -> List[ArtifactRead]:
+    artifacts = load_artifacts(session, [project.id]).get(project.id, [])
+    return [ArtifactRead(**item) for item in project_payload(project, artifacts)["artifacts"]]
 
 
+@profiling.traced
 def run_pipeline(project_id: int) -> None:
+    sampler = profiling.Sampler(threads=[threading.get_ident()]).start() if profiling.sample_pipeline() else None
+    try:
+        _run_pipeline(project_id)
+    finally:
+        # Frees the slot reserved by admit() when the project was submitted
+        admission.controller.release()
+        if sampler is not None:
+            sampler.stop()
+            try:
+                profile_dir = storage.project_dir(project_id) / profiling.PROFILES_DIR
+                profiling.write_profile(profile_dir, profiling.profile_name("pipeline"), sampler)
+            except OSError:
+                log.warning("pipeline profile for project %s not written", project_id, exc_info=True)
+
+
+def _run_pipeline(project_id: int) -> None:
     from .database import engine as _engine
     with Session(_engine) as session:
         project = session.get(Project, project_id)
@@ -81,116 +203,320 @@ def run_pipeline(project_id: int) -> None:
         session.add(project)
         session.commit()
 
-        proj_dir = ARTIFACTS_DIR / str(project.id)
-        ensure_dir(proj_dir)
-
-        # 1) Captions/Transcription (stub)
-        transcript = captions_or_transcribe(project.youtube_url, work_dir=proj_dir)
-        transcript_path = proj_dir / "transcript.txt"
-        transcript_path.write_text(transcript, encoding="utf-8")
-        project.transcript_path = str(transcript_path)
-        # 1.5) Viability check and persist
-        viab = check_viability(project.title or "", transcript)
-        project.mvp_viability = viab.get("mvp_viability")
-        project.viability_score = viab.get("viability_score")
-        project.viability_reason = viab.get("viability_reason")
-        session.add(project)
-        session.commit()
-
-        # Thresholds & gating: proceed when mvp-ready, or idea-only with score >= 0.5
-        proceed = False
-        if project.mvp_viability == "mvp-ready":
-            proceed = True
-        elif project.mvp_viability == "idea-only" and (project.viability_score or 0) >= 0.5:
-            proceed = True
-
-        if not proceed:
-            # Skip spec/prototype generation by default when below threshold
-            project.status = "complete"
+        proj_dir = storage.project_dir(project.id)
+        logger = get_logger(proj_dir, project_id=project.id)
+        try:
+            _run_stages(project, proj_dir, logger, session)
+            logger("Pipeline complete", status=project.status)
+        except Exception as e:
+            logger.error(f"Pipeline failed: {e}", error=type(e).__name__)
+            session.rollback()
+            project.status = "failed"
             project.updated_at = datetime.utcnow()
             session.add(project)
             session.commit()
-            return
-
-        # 2) Analyze → spec.json (stub deterministic)
-        spec = analyze_to_spec(transcript, project.title or "Generated MVP")
-        spec_path = proj_dir / "spec.json"
-        spec_path.write_text(__import__("json").dumps(spec, indent=2), encoding="utf-8")
-        project.spec_path = str(spec_path)
-
-        # 3) Generate prototype zip
-        zip_path = generate_prototype_zip(project.id, spec, ARTIFACTS_DIR)
-        project.prototype_zip_path = str(zip_path)
-
+        finally:
+            logger.close()
+
+
+def _run_stages(project: Project, proj_dir: Path, logger: PipelineLogger, session: Session) -> None:
+    # 1) Captions/Transcription (stub)
+    transcript = captions_or_transcribe(project.youtube_url, work_dir=proj_dir, log=logger.bind("captions"))
+    transcript_path = storage.write_text(project.id, "transcript.txt", transcript, compress=True)
+    project.transcript_path = str(transcript_path)
+    search.index_project(session, project.id, project.title, transcript)
+    logger("Transcript written", stage="captions", chars=len(transcript))
+    # 1.2) Near-duplicate of an earlier transcript? Reuse its verdict/spec instead of the LLM
+    source, similarity, signature = find_duplicate(session, project.id, transcript)
+    if source is not None:
+        logger("Near-duplicate transcript", stage="dedupe", source_project_id=source.id, similarity=round(similarity, 3))
+
+    # 1.5) Viability check and persist
+    if source is not None:
+        viab = {
+            "mvp_viability": source.mvp_viability,
+            "viability_score": source.viability_score,
+            "viability_reason": source.viability_reason,
+        }
+    else:
+        viab = check_viability(project.title or "", transcript)
+    project.mvp_viability = viab.get("mvp_viability")
+    project.viability_score = viab.get("viability_score")
+    project.viability_reason = viab.get("viability_reason")
+    session.add(project)
+    session.commit()
+    logger("Viability assessed", stage="viability", verdict=project.mvp_viability, score=project.viability_score)
+
+    # Thresholds & gating: proceed when mvp-ready, or idea-only with score >= 0.5
+    proceed = False
+    if project.mvp_viability == "mvp-ready":
+        proceed = True
+    elif project.mvp_viability == "idea-only" and (project.viability_score or 0) >= 0.5:
+        proceed = True
+
+    if not proceed:
+        # Skip spec/prototype generation by default when below threshold
+        logger("Below viability threshold; skipping spec and prototype", stage="viability")
+        if signature is not None:
+            remember_signature(session, project.id, signature)
         project.status = "complete"
         project.updated_at = datetime.utcnow()
         session.add(project)
         session.commit()
+        return
+
+    # 2) Analyze → spec.json (stub deterministic)
+    spec = None
+    if source is not None and source.spec_path:
+        try:
+            spec = json.loads(storage.read_text(source.spec_path))
+            logger("Reused spec", stage="spec", source_project_id=source.id)
+        except (FileNotFoundError, ValueError):
+            spec = None
+    spec_reused = spec is not None
+    if spec is None:
+        spec = analyze_to_spec(transcript, project.title or "Generated MVP")
+    spec_path = storage.write_text(project.id, "spec.json", json.dumps(spec, indent=2), compress=True)
+    project.spec_path = str(spec_path)
+    search.index_project(session, project.id, project.title, transcript, spec)
+    logger("Spec written", stage="spec")
+
+    # 3) Generate prototype zip
+    zip_path = None
+    # The source's zip embeds its spec, so it only fits when that spec was reused too
+    if DEDUPE_REUSE_ZIP and spec_reused and source.prototype_zip_path:
+        try:
+            zip_path = storage.save(project.id, "prototype.zip", storage.read_bytes(source.prototype_zip_path))
+        except FileNotFoundError:
+            zip_path = None
+    if zip_path is None:
+        zip_path = generate_prototype_zip(project.id, spec, storage)
+    project.prototype_zip_path = str(zip_path)
+    logger("Prototype zip generated", stage="prototype")
+    evicted = enforce_quota(storage, session, protect=[zip_path])
+    if evicted:
+        logger("Evicted artifacts to stay under quota", stage="storage", paths=[str(p) for p in evicted])
+
+    # Later near-duplicates may reuse this project's results only now that they are final
+    if signature is not None:
+        remember_signature(session, project.id, signature)
+    project.status = "complete"
+    project.updated_at = datetime.utcnow()
+    session.add(project)
+    session.commit()
 
 
-@app.post("/api/projects", response_model=ProjectRead)
-def create_project(payload: ProjectCreate, background: BackgroundTasks, session: Session = Depends(get_session)):
+def admit(request: Request, cost: int = 1, reserved: int = 0) -> None:
+    """Apply per-client rate limits and the global pipeline cap, or raise 429/413."""
+    client, plan = admission.identify(request.headers, request.client.host if request.client else None)
+    try:
+        admission.controller.admit(client, plan, cost, reserved)
+    except admission.Rejected as e:
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+
+
+@app.post("/api/projects", response_model=ProjectRead, response_class=FastJSONResponse)
+def create_project(payload: ProjectCreate, request: Request, background: BackgroundTasks, session: Session = Depends(get_session)):
+    admit(request)
     project = Project(youtube_url=payload.youtube_url, title=payload.title or None, status="queued")
-    session.add(project)
-    session.commit()
-    session.refresh(project)
+    try:
+        session.add(project)
+        session.commit()
+        session.refresh(project)
+    except Exception:
+        admission.controller.release()
+        raise
 
     # Queue background pipeline
     background.add_task(run_pipeline, project.id)
 
-    return ProjectRead(
-        id=project.id,
-        youtube_url=project.youtube_url,
-        title=project.title,
-        status=project.status,
-        mvp_viability=project.mvp_viability,
-        viability_score=project.viability_score,
-        viability_reason=project.viability_reason,
-        artifacts=project_artifacts_urls(project, session),
-        created_at=project.created_at,
-        updated_at=project.updated_at,
+    return FastJSONResponse(project_payload(project))
+
+
+def run_batch(project_ids: List[int]) -> None:
+    """Run a batch's pipelines with at most BULK_CONCURRENCY of them in flight."""
+    with ThreadPoolExecutor(max_workers=max(1, BULK_CONCURRENCY), thread_name_prefix="batch") as pool:
+        # Each pipeline runs in a copy of this context, so a profiled request still follows it
+        futures = [pool.submit(contextvars.copy_context().run, run_pipeline, pid) for pid in project_ids]
+        for future in futures:
+            future.result()
+
+
+def batch_read(batch: Batch, session: Session, **extra) -> BatchRead:
+    rows = session.exec(
+        select(Project.status, func.count()).where(Project.batch_id == batch.id).group_by(Project.status)
+    ).all()
+    counts = {status: n for status, n in rows}
+    done = counts.get("complete", 0) + counts.get("failed", 0)
+    if done >= batch.total:
+        status = "complete"
+    elif counts.get("queued", 0) == batch.total:
+        status = "queued"
+    else:
+        status = "processing"
+    if "project_ids" not in extra:
+        extra["project_ids"] = list(session.exec(select(Project.id).where(Project.batch_id == batch.id).order_by(Project.id)).all())
+    return BatchRead(
+        id=batch.id,
+        source=batch.source,
+        total=batch.total,
+        status=status,
+        counts=counts,
+        progress=(done / batch.total) if batch.total else 1.0,
+        created_at=batch.created_at,
+        **extra,
     )
 
 
-@app.get("/api/projects", response_model=List[ProjectRead])
+@app.post("/api/projects/bulk", response_model=BatchRead)
+def create_projects_bulk(payload: ProjectBulkCreate, request: Request, background: BackgroundTasks, session: Session = Depends(get_session)):
+    # Take one slot before any upstream work, so rate-limited clients can't drive playlist
+    # expansions; the rest of the batch is charged once its size is known
+    admit(request)
+    try:
+        entries = [(u, None) for u in payload.urls]
+        if payload.playlist_url:
+            try:
+                # One past the cap, so a longer playlist is rejected rather than silently cut off
+                playlist = expand_playlist(payload.playlist_url, limit=BULK_MAX_ITEMS + 1)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Could not expand playlist: {e}")
+            if len(playlist) > BULK_MAX_ITEMS:
+                raise HTTPException(status_code=413, detail=f"Playlist has more than {BULK_MAX_ITEMS} videos")
+            entries += playlist
+
+        # Dedupe by video ID so mirrors of the same URL (youtu.be, &t=..., etc.) run once
+        seen = set()
+        unique = []
+        invalid: List[str] = []
+        duplicates = 0
+        for url, title in entries:
+            url = url.strip()
+            vid = extract_youtube_id(url)
+            if not vid:
+                invalid.append(url)
+                continue
+            if vid in seen:
+                duplicates += 1
+                continue
+            seen.add(vid)
+            unique.append((url, title))
+        if not unique:
+            raise HTTPException(status_code=400, detail="No valid YouTube URLs")
+        if len(unique) > BULK_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {BULK_MAX_ITEMS} videos")
+        admit(request, cost=len(unique), reserved=1)
+    except Exception:
+        admission.controller.release()
+        raise
+
+    # Single transaction for the batch and all of its projects
+    batch = Batch(source=payload.playlist_url, total=len(unique))
+    try:
+        session.add(batch)
+        session.flush()
+        projects = [Project(youtube_url=url, title=title, status="queued", batch_id=batch.id) for url, title in unique]
+        session.add_all(projects)
+        session.flush()
+        project_ids = [p.id for p in projects]
+        session.commit()
+    except Exception:
+        # No pipeline will run for these; give back the slots admit() reserved
+        admission.controller.release(len(unique))
+        raise
+
+    background.add_task(run_batch, project_ids)
+    return batch_read(batch, session, project_ids=project_ids, duplicates=duplicates, invalid=invalid)
+
+
+@app.get("/api/batches/{batch_id}", response_model=BatchRead)
+def get_batch(batch_id: int, session: Session = Depends(get_session)):
+    batch = session.get(Batch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch_read(batch, session)
+
+
+@app.get("/api/projects", response_model=List[ProjectRead], response_class=FastJSONResponse)
 def list_projects(session: Session = Depends(get_session)):
-    projects = session.exec(select(Project).order_by(Project.created_at.desc())).all()
-    out: List[ProjectRead] = []
-    for p in projects:
-        out.append(
-            ProjectRead(
-                id=p.id,
-                youtube_url=p.youtube_url,
-                title=p.title,
-                status=p.status,
-                mvp_viability=p.mvp_viability,
-                viability_score=p.viability_score,
-                viability_reason=p.viability_reason,
-                artifacts=project_artifacts_urls(p, session),
-                created_at=p.created_at,
-                updated_at=p.updated_at,
-            )
-        )
-    return out
-
-
-@app.get("/api/projects/{project_id}", response_model=ProjectRead)
+    rows = session.exec(select(*PROJECT_READ_COLUMNS).order_by(Project.created_at.desc())).all()
+    artifacts = load_artifacts(session)
+    return FastJSONResponse([project_payload(p, artifacts.get(p.id, ())) for p in rows])
+
+
+@app.get("/api/projects/search", response_model=ProjectSearchResults, response_class=FastJSONResponse)
+def search_projects(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(get_session),
+):
+    if not search.available(session):
+        raise HTTPException(status_code=503, detail="Search index unavailable")
+    if offset >= search.RANK_WINDOW:
+        raise HTTPException(status_code=400, detail=f"Results are ranked to a depth of {search.RANK_WINDOW}; refine the query")
+    total, hits = search.search(session, q, limit=limit, offset=offset)
+    return FastJSONResponse({
+        "query": q,
+        "total": total,
+        "total_capped": total >= search.COUNT_LIMIT,
+        "limit": limit,
+        "offset": offset,
+        "results": hits,
+    })
+
+
+@app.get("/api/projects/{project_id}", response_model=ProjectRead, response_class=FastJSONResponse)
 def get_project(project_id: int, session: Session = Depends(get_session)):
     p = session.get(Project, project_id)
     if not p:
         raise HTTPException(status_code=404, detail="Project not found")
-    return ProjectRead(
-        id=p.id,
-        youtube_url=p.youtube_url,
-        title=p.title,
-        status=p.status,
-        mvp_viability=p.mvp_viability,
-        viability_score=p.viability_score,
-        viability_reason=p.viability_reason,
-        artifacts=project_artifacts_urls(p, session),
-        created_at=p.created_at,
-        updated_at=p.updated_at,
-    )
+    return FastJSONResponse(project_payload(p, load_artifacts(session, [p.id]).get(p.id, ())))
+
+
+@app.get("/api/projects/{project_id}/logs")
+def project_logs(project_id: int, follow_: bool = Query(False, alias="follow"), tail: int = Query(200, ge=0, le=5000), session: Session = Depends(get_session)):
+    p = session.get(Project, project_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Project not found")
+    proj_dir = storage.project_dir(project_id)
+    flush_logger(proj_dir)
+    log_path = proj_dir / "pipeline.log"
+    if not follow_:
+        return read_tail(log_path, tail)
+
+    if not _log_followers.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Too many log followers", headers={"Retry-After": "5"})
+    from .database import engine as _engine
+    deadline = time.monotonic() + LOG_FOLLOW_TIMEOUT
+    released = False
+
+    def release() -> None:
+        # Runs from the stream's finally and as the response's background task (which
+        # also covers a client gone before the stream started); only the first counts
+        nonlocal released
+        if not released:
+            released = True
+            _log_followers.release()
+
+    def finished() -> bool:
+        # Called only when the tail is idle; flush so no buffered entries are missed
+        flush_logger(proj_dir)
+        if time.monotonic() > deadline:
+            return True
+        with Session(_engine) as s:
+            cur = s.get(Project, project_id)
+            return cur is None or cur.status in ("complete", "failed")
+
+    async def stream():
+        try:
+            async for entry in follow(log_path, tail, stop=finished):
+                yield json.dumps(entry, default=str) + "\n"
+        finally:
+            release()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", background=BackgroundTask(release))
 
 
 @app.post("/api/projects/{project_id}/artifacts", response_model=ArtifactRead)
@@ -198,33 +524,32 @@ async def upload_artifact(project_id: int, file: UploadFile = File(...), session
     project = session.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    proj_dir = ARTIFACTS_DIR / str(project_id)
-    ensure_dir(proj_dir)
     filename = file.filename or "upload.bin"
-    dest = proj_dir / filename
     contents = await file.read()
-    dest.write_bytes(contents)
+    try:
+        dest = storage.save_upload(project_id, filename, contents)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    artifact = Artifact(project_id=project_id, type="upload", path=str(dest))
+    rel_path = storage.relpath(dest)
+    artifact = Artifact(project_id=project_id, type="upload", path=str(dest), rel_path=rel_path)
     session.add(artifact)
     session.commit()
     session.refresh(artifact)
-    rel = dest.relative_to(ARTIFACTS_DIR)
-    url = f"{BACKEND_BASE_URL}/downloads/{rel.as_posix()}"
+    # Over quota this walks the artifacts tree; keep it off the event loop
+    await anyio.to_thread.run_sync(lambda: enforce_quota(storage, session, protect=[dest]))
+    url = _DOWNLOADS_URL + rel_path
     return ArtifactRead(id=artifact.id, type=artifact.type, url=url, created_at=artifact.created_at)
 
 
 @app.post("/api/generate-prototype")
 def generate_prototype(spec: dict, project_id: Optional[int] = None, session: Session = Depends(get_session)):
-    pid = project_id or 0
     if project_id:
         project = session.get(Project, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
-    zip_path = generate_prototype_zip(project_id or 0, spec, ARTIFACTS_DIR)
-    rel = Path(zip_path).relative_to(ARTIFACTS_DIR)
-    url = f"{BACKEND_BASE_URL}/downloads/{rel.as_posix()}"
-    return {"zip_url": url}
+    zip_path = generate_prototype_zip(project_id or UNATTACHED_ID, spec, storage)
+    return {"zip_url": _DOWNLOADS_URL + storage.relpath(zip_path)}
 
 
 @app.post("/api/projects/{project_id}/complete")
@@ -244,3 +569,33 @@ def viability_check(payload: dict):
     title = payload.get("title", "") if isinstance(payload, dict) else ""
     transcript = payload.get("transcript", "") if isinstance(payload, dict) else ""
     return check_viability(title, transcript)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not profiling.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.get("/api/admin/profiles", dependencies=[Depends(require_admin)])
+def list_profiles(project_id: Optional[int] = None):
+    """Profiles of a project's requests and pipeline runs (or of other requests), newest first."""
+    return [
+        {
+            "name": p.name,
+            "project_id": project_id,
+            "bytes": p.stat().st_size,
+            "url": f"/api/admin/profiles/{p.name}" + (f"?project_id={project_id}" if project_id is not None else ""),
+        }
+        for p in profiling.list_profiles(_profiles_dir(project_id))
+    ]
+
+
+@app.get("/api/admin/profiles/{name}", dependencies=[Depends(require_admin)])
+def get_profile(name: str, project_id: Optional[int] = None):
+    path = _profiles_dir(project_id) / Path(name).name
+    if name != path.name or name.startswith(".") or not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if name.endswith(".json") else "text/plain; charset=utf-8"
+    return FileResponse(path, media_type=media_type, filename=name)
@@ -10,6 +10,13 @@ class User(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class Batch(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: Optional[str] = None  # playlist URL when expanded from one
+    total: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Project(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     youtube_url: str
@@ -23,6 +30,7 @@ class Project(SQLModel, table=True):
     mvp_viability: Optional[str] = Field(default=None)  # "mvp-ready" | "idea-only" | "not-a-project"
     viability_score: Optional[float] = Field(default=None)
     viability_reason: Optional[str] = Field(default=None)
+    batch_id: Optional[int] = Field(default=None, foreign_key="batch.id", index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -32,4 +40,11 @@ class Artifact(SQLModel, table=True):
     project_id: int = Field(foreign_key="project.id")
     type: str  # e.g., caption, transcript, spec, prototype_zip, other
     path: str
+    rel_path: Optional[str] = None  # path under ARTIFACTS_DIR, as served from /downloads
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TranscriptSignature(SQLModel, table=True):
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    minhash: bytes  # array("I") of app.services.dedupe.NUM_PERM values
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,116 @@
+import gzip
+import mimetypes
+import stat
+from pathlib import PurePosixPath
+from typing import Any
+
+import anyio
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import NotModifiedResponse
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # fallback when package missing
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (datetimes included) when available.
+
+    Endpoints return this directly with plain dict/list content so FastAPI skips
+    response-model validation and serialization.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class CompressedStaticFiles(StaticFiles):
+    """StaticFiles that also serves `<name>` from a stored `<name>.gz`.
+
+    Clients that accept gzip get the stored bytes as-is with `Content-Encoding: gzip`;
+    others get them decompressed. Both carry Last-Modified and an ETag (distinct per
+    encoding) and answer conditional requests with 304, like plain files. Directories
+    named in `hidden` (admin-only profiles) are 404 here.
+    """
+
+    def __init__(self, *args, hidden=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hidden = frozenset(hidden)  # directory names never served, at any depth
+
+    async def get_response(self, path: str, scope) -> Response:
+        if self.hidden and not self.hidden.isdisjoint(PurePosixPath(path).parts):
+            raise HTTPException(status_code=404)
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404:
+                raise
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + ".gz")
+        if not (stat_result and stat.S_ISREG(stat_result.st_mode)):
+            raise HTTPException(status_code=404)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        request_headers = Headers(scope=scope)
+        # Builds the stat headers (ETag, Last-Modified) of the stored file without reading it
+        stored = FileResponse(
+            full_path,
+            stat_result=stat_result,
+            media_type=media_type,
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+        if accepts_gzip(request_headers.get("accept-encoding", "")):
+            if self.is_not_modified(stored.headers, request_headers):
+                return NotModifiedResponse(stored.headers)
+            return stored
+        headers = {
+            "ETag": stored.headers["etag"][:-1] + '-identity"',
+            "Last-Modified": stored.headers["last-modified"],
+            "Vary": "Accept-Encoding",
+        }
+        if self.is_not_modified(Headers(headers), request_headers):
+            return NotModifiedResponse(Headers(headers))
+        data = await anyio.to_thread.run_sync(_gunzip, full_path)
+        return Response(data, media_type=media_type, headers=headers)
+
+
+class NegotiatedGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves responses alone for clients refusing gzip with `q=0`."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding value allows gzip, honouring q-values (`gzip;q=0` refuses it)."""
+    wildcard = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            return q > 0
+        if coding == "*":
+            wildcard = q > 0
+    return bool(wildcard)
+
+
+def _gunzip(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return gzip.decompress(f.read())
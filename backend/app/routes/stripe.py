@@ -3,23 +3,27 @@ import os
 
 router = APIRouter(prefix="/api/stripe", tags=["billing"])
 
-try:
-    import stripe  # type: ignore
-except Exception:  # pragma: no cover
-    stripe = None  # fallback when package missing
+# Billing tiers; admission control keys its per-plan rate limits on these
+PLANS = ("free", "pro", "studio")
+
+
+def _load_stripe():
+    # Imported on first checkout rather than at startup; the SDK is slow to import
+    try:
+        import stripe  # type: ignore
+    except Exception:  # pragma: no cover
+        return None  # fallback when package missing
+    return stripe
 
 
 @router.post("/create-checkout-session")
 def create_checkout_session(plan: str = Query("pro")):
     secret = os.getenv("STRIPE_SECRET_KEY")
     domain = os.getenv("FRONTEND_URL", "http://localhost:3000")
-    price_id = {
-        "free": os.getenv("STRIPE_PRICE_FREE"),
-        "pro": os.getenv("STRIPE_PRICE_PRO"),
-        "studio": os.getenv("STRIPE_PRICE_STUDIO"),
-    }.get(plan.lower(), os.getenv("STRIPE_PRICE_PRO"))
+    price_id = {p: os.getenv(f"STRIPE_PRICE_{p.upper()}") for p in PLANS}.get(plan.lower(), os.getenv("STRIPE_PRICE_PRO"))
 
     # Graceful fallback when not configured
+    stripe = _load_stripe() if secret and price_id else None
     if not secret or not price_id or not stripe:
         # Return a dummy URL so the button remains harmless in dev
         return {"url": f"{domain}/pricing"}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -33,3 +33,42 @@ class ProjectRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ProjectBulkCreate(BaseModel):
+    urls: List[str] = []
+    playlist_url: Optional[str] = None
+
+
+class BatchRead(BaseModel):
+    id: int
+    source: Optional[str] = None
+    total: int
+    status: str  # queued, processing, complete
+    counts: Dict[str, int] = {}
+    progress: float = 0.0
+    project_ids: List[int] = []
+    duplicates: int = 0
+    invalid: List[str] = []
+    created_at: datetime
+
+
+class ProjectSearchHit(BaseModel):
+    id: int
+    youtube_url: str
+    title: Optional[str]
+    status: str
+    mvp_viability: Optional[str] = None
+    viability_score: Optional[float] = None
+    score: float
+    snippet: str  # HTML-escaped text, matched terms wrapped in <mark>…</mark>
+    created_at: datetime
+
+
+class ProjectSearchResults(BaseModel):
+    query: str
+    total: int
+    total_capped: bool = False  # more than SEARCH_COUNT_LIMIT matches; `total` is a lower bound
+    limit: int
+    offset: int
+    results: List[ProjectSearchHit] = []
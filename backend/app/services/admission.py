@@ -0,0 +1,124 @@
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from ..routes.stripe import PLANS
+
+# Per-plan token buckets: "<submissions per hour>,<burst>"
+DEFAULT_PLAN_LIMITS = {"free": "20,5", "pro": "120,20", "studio": "600,50"}
+MAX_PENDING_PIPELINES = int(os.getenv("MAX_PENDING_PIPELINES", "50"))
+# Retry-After when the global cap (not a client bucket) is what's full
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "30"))
+# Behind Render's proxy the peer address is the proxy; only trust X-Forwarded-For when told to.
+# Each proxy appends the address it saw, so the client is TRUSTED_PROXY_HOPS entries from the
+# right; anything further left was sent by the client itself and can't be trusted.
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "").lower() in ("1", "true", "yes")
+TRUSTED_PROXY_HOPS = max(1, int(os.getenv("TRUSTED_PROXY_HOPS", "1")))
+MAX_TRACKED_CLIENTS = 10000
+
+
+def _parse_limit(raw: str) -> Tuple[float, float]:
+    per_hour, _, burst = raw.partition(",")
+    rate = float(per_hour) / 3600.0
+    return rate, float(burst or per_hour)
+
+
+def plan_limits() -> Dict[str, Tuple[float, float]]:
+    """(tokens per second, bucket capacity) for each Stripe plan."""
+    return {plan: _parse_limit(os.getenv(f"RATE_LIMIT_{plan.upper()}", DEFAULT_PLAN_LIMITS[plan])) for plan in PLANS}
+
+
+def _api_key_plans() -> Dict[str, str]:
+    """API_KEY_PLANS="key1:pro,key2:studio" → {key: plan}."""
+    out = {}
+    for item in os.getenv("API_KEY_PLANS", "").split(","):
+        key, _, plan = item.strip().partition(":")
+        if key and plan.lower() in PLANS:
+            out[key] = plan.lower()
+    return out
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Token bucket per client plus a global cap on queued + running pipelines.
+
+    All state is a dict and a counter behind one lock; an admit is a few float
+    operations, so it adds no measurable latency to a submission.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None, max_pending: int = MAX_PENDING_PIPELINES):
+        self.limits = limits or plan_limits()
+        self.max_pending = max_pending
+        self.pending = 0
+        self._buckets: Dict[str, list] = {}  # client -> [tokens, last refill (monotonic), rate, burst]
+        self._lock = threading.Lock()
+
+    def admit(self, client: str, plan: str = "free", cost: int = 1, reserved: int = 0) -> None:
+        """Reserve `cost` pipeline slots for `client`, or raise Rejected.
+
+        `reserved` slots were already taken by an earlier admit() for the same request
+        (e.g. before expanding a playlist); only the rest is charged now.
+        """
+        rate, burst = self.limits.get(plan, self.limits["free"])
+        if cost > burst:
+            raise Rejected(413, f"Request needs {cost} submissions; the {plan} plan allows bursts of {int(burst)}")
+        if cost > self.max_pending:
+            # Would never fit under the global cap, however long the client waited
+            raise Rejected(413, f"Request needs {cost} submissions; at most {self.max_pending} pipelines can be queued")
+        charge = cost - reserved
+        now = time.monotonic()
+        with self._lock:
+            if self.pending + charge > self.max_pending:
+                raise Rejected(429, "Too many pipelines queued; try again later", ADMISSION_RETRY_AFTER)
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                if len(self._buckets) >= MAX_TRACKED_CLIENTS:
+                    self._prune(now)
+                bucket = self._buckets[client] = [burst, now, rate, burst]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] < charge:
+                wait = (charge - bucket[0]) / rate if rate else ADMISSION_RETRY_AFTER
+                raise Rejected(429, f"Rate limit exceeded for the {plan} plan", max(1, math.ceil(wait)))
+            bucket[0] -= charge
+            self.pending += charge
+
+    def release(self, n: int = 1) -> None:
+        """A pipeline admitted earlier has finished (or will never run)."""
+        with self._lock:
+            self.pending = max(0, self.pending - n)
+
+    def _prune(self, now: float) -> None:
+        # Drop clients whose bucket would be full again; they are indistinguishable from new ones
+        full = [c for c, (tokens, last, rate, burst) in self._buckets.items() if tokens + (now - last) * rate >= burst]
+        for client in full:
+            del self._buckets[client]
+
+
+def identify(headers, peer: Optional[str]) -> Tuple[str, str]:
+    """(client key, plan) for a request: a known API key, else the client IP on the free plan."""
+    key = headers.get("x-api-key")
+    if key:
+        plan = API_KEY_PLANS.get(key)
+        if plan:
+            return f"key:{key}", plan
+    ip = peer or "unknown"
+    if TRUST_FORWARDED_FOR and headers.get("x-forwarded-for"):
+        hops = [h.strip() for h in headers["x-forwarded-for"].split(",") if h.strip()]
+        if hops:
+            ip = hops[max(0, len(hops) - TRUSTED_PROXY_HOPS)]
+    return f"ip:{ip}", "free"
+
+
+API_KEY_PLANS = _api_key_plans()
+controller = AdmissionController()
@@ -0,0 +1,196 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from ..models import Project, TranscriptSignature
+from .pipeline import is_stub_transcript
+
+# Near-duplicate transcripts (re-uploads, mirrors, clips) are found with MinHash over
+# word shingles and LSH banding; a match above DEDUPE_THRESHOLD reuses the earlier
+# project's viability verdict and spec instead of calling the LLM again.
+DEDUPE_ENABLED = os.getenv("DEDUPE_ENABLED", "1").lower() not in ("0", "false", "no")
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", "0.85"))
+DEDUPE_REUSE_ZIP = os.getenv("DEDUPE_REUSE_ZIP", "").lower() in ("1", "true", "yes")
+SHINGLE_WORDS = 5
+NUM_PERM = 64
+BANDS = 8  # 8 bands x 8 rows: pairs at ~0.77 Jaccard become candidates half the time
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)  # fixed: signatures are persisted and must stay comparable
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def shingles(text: str) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8")) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text: str) -> array:
+    """NUM_PERM 32-bit minimums of universal hashes over the text's shingles."""
+    sh = shingles(text)
+    if not sh:
+        return array("I", [0xFFFFFFFF] * NUM_PERM)
+    return array("I", [min((a * x + b) % _PRIME for x in sh) & 0xFFFFFFFF for a, b in _PERMS])
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+class MinHashIndex:
+    """In-memory LSH index: BANDS dicts from band hash to a project id, or a list of
+    ids on collision (most buckets hold one id; a list per bucket would triple memory)."""
+
+    def __init__(self):
+        self.signatures: Dict[int, array] = {}
+        self.bands: List[Dict[int, object]] = [{} for _ in range(BANDS)]
+        self.queries = 0
+        self.query_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _band_keys(sig: array) -> List[int]:
+        raw = sig.tobytes()
+        step = ROWS * sig.itemsize
+        return [hash(raw[i * step:(i + 1) * step]) for i in range(BANDS)]
+
+    def add(self, project_id: int, sig: array) -> None:
+        with self._lock:
+            if project_id in self.signatures:
+                self._remove(project_id)
+            self.signatures[project_id] = sig
+            for band, key in zip(self.bands, self._band_keys(sig)):
+                cur = band.get(key)
+                if cur is None:
+                    band[key] = project_id
+                elif isinstance(cur, list):
+                    cur.append(project_id)
+                else:
+                    band[key] = [cur, project_id]
+
+    def _remove(self, project_id: int) -> None:
+        sig = self.signatures.pop(project_id)
+        for band, key in zip(self.bands, self._band_keys(sig)):
+            cur = band.get(key)
+            if cur == project_id:
+                del band[key]
+            elif isinstance(cur, list) and project_id in cur:
+                cur.remove(project_id)
+                if len(cur) == 1:
+                    band[key] = cur[0]
+
+    def query(self, sig: array, threshold: float = DEDUPE_THRESHOLD, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(project_id, similarity) of indexed signatures at or above threshold, best first."""
+        t0 = time.perf_counter()
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self.bands, self._band_keys(sig)):
+                cur = band.get(key)
+                if isinstance(cur, list):
+                    candidates.update(cur)
+                elif cur is not None:
+                    candidates.add(cur)
+            candidates.discard(exclude)
+            scored = [(pid, similarity(sig, self.signatures[pid])) for pid in candidates]
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - t0
+        return sorted((m for m in scored if m[1] >= threshold), key=lambda m: -m[1])
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            size = sys.getsizeof(self.signatures) + sum(sys.getsizeof(s) for s in self.signatures.values())
+            for band in self.bands:
+                size += sys.getsizeof(band) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in band.items())
+            return {
+                "entries": len(self.signatures),
+                "approx_bytes": size,
+                "queries": self.queries,
+                "avg_query_ms": (self.query_seconds / self.queries * 1000.0) if self.queries else 0.0,
+            }
+
+
+index = MinHashIndex()
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def _ensure_loaded(session: Session) -> None:
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        for row in session.exec(select(TranscriptSignature)).all():
+            index.add(row.project_id, array("I", row.minhash))
+        _loaded = True
+
+
+def remember(session: Session, project_id: int, sig: array) -> None:
+    """Persist and index a project's transcript signature."""
+    row = session.get(TranscriptSignature, project_id) or TranscriptSignature(project_id=project_id, minhash=b"")
+    row.minhash = sig.tobytes()
+    session.add(row)
+    session.commit()
+    index.add(project_id, sig)
+
+
+def find_duplicate(session: Session, project_id: int, transcript: str) -> Tuple[Optional[Project], float, Optional[array]]:
+    """Best earlier project with a near-identical transcript and a usable verdict.
+
+    Returns (project or None, similarity, signature of `transcript`). The caller
+    records the signature with remember() once this project's results are final.
+    Stub transcripts are never matched and have no signature.
+    """
+    if is_stub_transcript(transcript):
+        return None, 0.0, None
+    sig = minhash(transcript)
+    if not DEDUPE_ENABLED:
+        return None, 0.0, sig
+    _ensure_loaded(session)
+    for pid, score in index.query(sig, exclude=project_id):
+        source = session.get(Project, pid)
+        if source is not None and source.status == "complete" and source.mvp_viability:
+            return source, score, sig
+    return None, 0.0, sig
+
+
+def rebuild(session: Session, storage) -> int:
+    """Compute signatures for every project with a transcript on disk."""
+    count = 0
+    for project in session.exec(select(Project).where(Project.transcript_path.is_not(None))).all():  # type: ignore[union-attr]
+        try:
+            text = storage.read_text(project.transcript_path)
+        except FileNotFoundError:
+            continue
+        if is_stub_transcript(text):
+            continue
+        remember(session, project.id, minhash(text))
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    # python -m app.services.dedupe rebuild
+    from ..database import engine, init_db
+    from ..main import storage as _storage
+
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.services.dedupe rebuild")
+    init_db()
+    with Session(engine) as _session:
+        print(f"indexed {rebuild(_session, _storage)} transcripts")
+    print(index.stats())
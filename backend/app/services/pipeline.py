@@ -2,18 +2,61 @@ import io
 import json
 import os
 import re
-import shutil
 import zipfile
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-from yt_dlp import YoutubeDL
-import requests
 import xml.etree.ElementTree as ET
 import html
 
+from .pipeline_log import get_logger
+from .storage import RETENTION, ArtifactStorage
+
+# yt_dlp, youtube_transcript_api, requests and openai are imported inside the
+# functions that use them: they add ~100ms+ to startup and most API processes
+# never run a pipeline. Call prewarm() in workers that do.
+HEAVY_MODULES = ("yt_dlp", "youtube_transcript_api", "requests", "openai")
+
+# Audio for the Whisper fallback. Speech transcribes as well from ~32 kbps as from
+# 160 kbps, so by default the smallest audio-only stream above that floor is fetched.
+# AUDIO_MAX_MB defaults to just under the OpenAI transcription upload limit (25 MB).
+AUDIO_MODE = os.getenv("AUDIO_MODE", "speech").lower()  # speech | best
+AUDIO_MIN_ABR = float(os.getenv("AUDIO_MIN_ABR", "32"))  # kbps
+AUDIO_MAX_DURATION = float(os.getenv("AUDIO_MAX_DURATION", "10800"))  # seconds; 0 disables
+AUDIO_MAX_BYTES = int(float(os.getenv("AUDIO_MAX_MB", "24")) * 1024 * 1024)  # 0 disables
+AUDIO_FRAGMENT_CONCURRENCY = int(os.getenv("AUDIO_FRAGMENT_CONCURRENCY", "4"))
+
+
+# Placeholder transcript used when neither captions nor Whisper produced one. Every
+# stub shares most of its text, so stubs must not be compared with each other.
+STUB_TRANSCRIPT_PREFIX = "Transcript for video "
+_STUB_NOTE = "This is a mocked transcript generated for local testing."
+
+
+class AudioRejected(RuntimeError):
+    """The video's audio is over AUDIO_MAX_DURATION or AUDIO_MAX_MB; nothing was kept."""
+
+
+def is_stub_transcript(text: str) -> bool:
+    return text.startswith(STUB_TRANSCRIPT_PREFIX) and _STUB_NOTE in text
+
+
+def prewarm() -> Dict[str, float]:
+    """Import the pipeline's heavy dependencies ahead of first use; returns seconds per module."""
+    import importlib
+    import time
+
+    timings: Dict[str, float] = {}
+    for name in HEAVY_MODULES:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        timings[name] = time.perf_counter() - t0
+    return timings
+
 
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
@@ -28,20 +71,32 @@ def sanitize_filename(name: str) -> str:
     return re.sub(r"[^a-zA-Z0-9_-]+", "-", name).strip("-")
 
 
-def captions_or_transcribe(youtube_url: str, work_dir: Optional[Path] = None) -> str:
-    """Try to fetch real YouTube captions; if unavailable, fallback to Whisper if OPENAI_API_KEY is set; otherwise stub."""
-    def log(msg: str):
+def captions_or_transcribe(youtube_url: str, work_dir: Optional[Path] = None, log=None) -> str:
+    """Try to fetch real YouTube captions; if unavailable, fallback to Whisper if OPENAI_API_KEY is set; otherwise stub.
+
+    `log` is a pipeline logger callable; when omitted, entries go to `work_dir/pipeline.log`.
+    """
+    own_logger = None
+    if log is None:
         if work_dir:
-            ensure_dir(work_dir)
-            with open((work_dir / "pipeline.log"), "a", encoding="utf-8") as lf:
-                lf.write(f"[{datetime.utcnow().isoformat()}Z] {msg}\n")
+            own_logger = get_logger(work_dir)
+            log = own_logger.bind("captions")
+        else:
+            log = lambda *_, **__: None  # noqa: E731
+    try:
+        return _captions_or_transcribe(youtube_url, work_dir, log)
+    finally:
+        if own_logger:
+            own_logger.flush()
+
 
+def _captions_or_transcribe(youtube_url: str, work_dir: Optional[Path], log) -> str:
     vid = extract_youtube_id(youtube_url)
     api_key_present = bool(os.getenv("OPENAI_API_KEY"))
     cookies = os.getenv("YT_COOKIES_FILE")
     cookies_present = bool(cookies and Path(cookies).exists())
-    log(f"Start pipeline for video_id={vid}")
-    log(f"env: openai_key_present={api_key_present}, cookies_present={cookies_present}")
+    log("Start pipeline", video_id=vid)
+    log("env", openai_key_present=api_key_present, cookies_present=cookies_present)
     if vid:
         text = fetch_youtube_captions(vid, log)
         if text:
@@ -52,9 +107,10 @@ def captions_or_transcribe(youtube_url: str, work_dir: Optional[Path] = None) ->
 
     api_key = os.getenv("OPENAI_API_KEY")
     if api_key and vid:
+        audio_path = None
         try:
-            audio_path = download_audio(youtube_url, dest_dir=work_dir)
-            log(f"Downloaded audio: {audio_path}")
+            audio_path = download_audio(youtube_url, dest_dir=work_dir, log=log)
+            log("Downloaded audio", path=str(audio_path) if audio_path else None, bytes=audio_path.stat().st_size if audio_path else None)
             if audio_path:
                 wt = whisper_transcribe(audio_path, api_key=api_key, log=log)
                 if wt.strip():
@@ -63,14 +119,19 @@ def captions_or_transcribe(youtube_url: str, work_dir: Optional[Path] = None) ->
                 else:
                     log("Whisper returned empty transcript")
         except Exception as e:
-            log(f"Whisper/download failed: {e}")
+            log(f"Whisper/download failed: {e}", level="error")
+        finally:
+            # Audio is an intermediate; drop it right away unless retention says otherwise
+            if audio_path and RETENTION.get("audio") == timedelta(0):
+                audio_path.unlink(missing_ok=True)
+                log("Removed intermediate audio", path=str(audio_path))
 
     # Fallback stub
     vid = vid or "unknown"
     log("Falling back to stub transcript")
     return (
-        f"Transcript for video {vid}.\n"
-        "This is a mocked transcript generated for local testing.\n"
+        f"{STUB_TRANSCRIPT_PREFIX}{vid}.\n"
+        f"{_STUB_NOTE}\n"
         "The video discusses building an MVP, focusing on goals, features, and a landing page.\n"
         "Key points: simplicity, Tailwind styling, and clear CTAs.\n"
     )
@@ -78,6 +139,8 @@ def captions_or_transcribe(youtube_url: str, work_dir: Optional[Path] = None) ->
 
 def fetch_youtube_captions(video_id: str, log=lambda *_: None) -> Optional[str]:
     """Fetch captions preferring English, manually-created first, then generated, else any."""
+    from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
+
     try:
         transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
         avail = []
@@ -133,6 +196,8 @@ def fetch_youtube_captions(video_id: str, log=lambda *_: None) -> Optional[str]:
 
 def fetch_youtube_captions_http(video_id: str, log=lambda *_: None) -> Optional[str]:
     """Fetch captions via public timedtext endpoint (manual or auto-generated)."""
+    import requests
+
     headers = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15",
     }
@@ -166,34 +231,107 @@ def fetch_youtube_captions_http(video_id: str, log=lambda *_: None) -> Optional[
     return None
 
 
-def download_audio(youtube_url: str, dest_dir: Optional[Path] = None) -> Optional[Path]:
-    """Download best audio without requiring ffmpeg; return the resulting file path (webm/m4a/…)
+def audio_format_selector(min_abr: Optional[float] = None, max_bytes: Optional[int] = None) -> str:
+    """yt-dlp format spec for speech: the lowest-bitrate audio-only format at or above
+    `min_abr` kbps that fits in `max_bytes`, else the best audio that fits, else the smallest.
+
+    "Lowest" relies on format_sort=["abr"] (see download_audio); yt-dlp's default order ranks codec before bitrate.
+    """
+    min_abr = AUDIO_MIN_ABR if min_abr is None else min_abr
+    max_bytes = AUDIO_MAX_BYTES if max_bytes is None else max_bytes
+    size = f"[filesize<?{max_bytes}][filesize_approx<?{max_bytes}]" if max_bytes else ""
+    return f"wa[abr>={min_abr:g}]{size}/ba{size}/wa"
+
+
+def download_audio(youtube_url: str, dest_dir: Optional[Path] = None, log=lambda *_, **__: None) -> Optional[Path]:
+    """Download audio without requiring ffmpeg; return the file yt-dlp wrote (webm/m4a/…).
+
+    AUDIO_MODE=speech (default) picks the smallest audio-only format that still meets
+    AUDIO_MIN_ABR; AUDIO_MODE=best takes the highest-quality stream. Either way videos
+    over AUDIO_MAX_DURATION or audio over AUDIO_MAX_MB raise AudioRejected before (or,
+    when the size isn't known up front, during) the download.
     """
+    from yt_dlp import YoutubeDL
+
     out_dir = dest_dir or Path.cwd()
     ensure_dir(out_dir)
     out_tmpl = str(out_dir / "audio.%(ext)s")
     cookies = os.getenv("YT_COOKIES_FILE")
     ydl_opts = {
-        "format": "bestaudio/best",
         "outtmpl": out_tmpl,
         "quiet": True,
         "noplaylist": True,
         "geo_bypass": True,
         "extractor_retries": 3,
-        "concurrent_fragment_downloads": 1,
         # Avoid ffmpeg postprocessing; Whisper accepts m4a/webm
         # Provide a generic UA to reduce 403 chances
         "http_headers": {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15"},
         # Emulate android client to bypass restrictions sometimes
         "extractor_args": {"youtube": {"player_client": ["android"]}},
     }
+    if AUDIO_MODE == "best":
+        ydl_opts.update({"format": "bestaudio/best", "concurrent_fragment_downloads": 1})
+    else:
+        ydl_opts.update({
+            "format": audio_format_selector(),
+            "format_sort": ["abr"],
+            # DASH/HLS audio arrives in fragments; fetch several at once
+            "concurrent_fragment_downloads": AUDIO_FRAGMENT_CONCURRENCY,
+        })
+    if AUDIO_MAX_BYTES:
+        # Enforced by yt-dlp while downloading when the size isn't known from the metadata
+        ydl_opts["max_filesize"] = AUDIO_MAX_BYTES
     if cookies and Path(cookies).exists():
         ydl_opts["cookiefile"] = cookies
     with YoutubeDL(ydl_opts) as ydl:
-        ydl.extract_info(youtube_url, download=True)
-    # Find the downloaded file (audio.*)
-    candidates = sorted(out_dir.glob("audio.*"), key=lambda p: p.stat().st_mtime, reverse=True)
-    return candidates[0] if candidates else None
+        # Resolve metadata and the chosen format first so the limits apply before any bytes move
+        info = ydl.extract_info(youtube_url, download=False) or {}
+        duration = info.get("duration") or 0
+        if AUDIO_MAX_DURATION and duration > AUDIO_MAX_DURATION:
+            raise AudioRejected(f"video is {duration:.0f}s long; AUDIO_MAX_DURATION is {AUDIO_MAX_DURATION:.0f}s")
+        expected = info.get("filesize") or info.get("filesize_approx")
+        if AUDIO_MAX_BYTES and expected and expected > AUDIO_MAX_BYTES:
+            raise AudioRejected(f"selected audio is {expected} bytes; AUDIO_MAX_MB allows {AUDIO_MAX_BYTES}")
+        log("Selected audio format", format_id=info.get("format_id"), ext=info.get("ext"), abr=info.get("abr"), expected_bytes=expected, duration=duration)
+        info = ydl.process_ie_result(info, download=True) or info
+    downloads = info.get("requested_downloads") or []
+    path = downloads[0].get("filepath") if downloads else info.get("filepath")
+    if not path or not Path(path).exists():
+        # max_filesize makes yt-dlp skip the file rather than fail
+        if AUDIO_MAX_BYTES and expected is None:
+            raise AudioRejected(f"audio exceeded AUDIO_MAX_MB ({AUDIO_MAX_BYTES} bytes) while downloading")
+        return None
+    return Path(path)
+
+
+def expand_playlist(playlist_url: str, limit: Optional[int] = None) -> List[Tuple[str, Optional[str]]]:
+    """List (video_url, title) for a playlist/channel without resolving each video (flat extraction)."""
+    from yt_dlp import YoutubeDL
+
+    ydl_opts = {
+        "extract_flat": "in_playlist",
+        "skip_download": True,
+        "quiet": True,
+        "extractor_retries": 3,
+    }
+    if limit:
+        ydl_opts["playlistend"] = limit
+    cookies = os.getenv("YT_COOKIES_FILE")
+    if cookies and Path(cookies).exists():
+        ydl_opts["cookiefile"] = cookies
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(playlist_url, download=False) or {}
+    out: List[Tuple[str, Optional[str]]] = []
+    for entry in info.get("entries") or []:
+        if not entry:
+            continue
+        url = entry.get("url") or entry.get("webpage_url")
+        if not url or not url.startswith("http"):
+            if not entry.get("id"):
+                continue
+            url = f"https://www.youtube.com/watch?v={entry['id']}"
+        out.append((url, entry.get("title")))
+    return out[:limit] if limit else out
 
 
 def whisper_transcribe(audio_path: Path, api_key: Optional[str] = None, log=lambda *_: None) -> str:
@@ -286,115 +424,79 @@ def analyze_to_spec(transcript: str, title_hint: str | None = None) -> Dict:
     }
 
 
-def generate_prototype_zip(project_id: int, spec: Dict, artifacts_dir: Path) -> Path:
-    # Create a minimal Next.js + Tailwind app with spec.json
-    proj_dir = artifacts_dir / str(project_id)
-    ensure_dir(proj_dir)
-    template_dir = proj_dir / "template"
-    if template_dir.exists():
-        shutil.rmtree(template_dir)
-    ensure_dir(template_dir)
-
-    # Files
-    (template_dir / "public").mkdir(parents=True, exist_ok=True)
-    (template_dir / "app").mkdir(parents=True, exist_ok=True)
-    (template_dir / "styles").mkdir(parents=True, exist_ok=True)
-
-    (template_dir / "package.json").write_text(
-        json.dumps(
-            {
-                "name": "generated-prototype",
-                "private": True,
-                "version": "0.1.0",
-                "scripts": {
-                    "dev": "next dev",
-                    "build": "next build",
-                    "start": "next start",
-                },
-                "dependencies": {
-                    "next": "14.1.0",
-                    "react": "18.2.0",
-                    "react-dom": "18.2.0",
-                    "tailwindcss": "^3.4.0",
-                    "autoprefixer": "^10.4.17",
-                    "postcss": "^8.4.35"
-                }
+def prototype_zip_bytes(spec: Dict) -> bytes:
+    # A minimal Next.js + Tailwind app with spec.json, built in memory
+    files: Dict[str, str] = {}
+
+    files["package.json"] = json.dumps(
+        {
+            "name": "generated-prototype",
+            "private": True,
+            "version": "0.1.0",
+            "scripts": {
+                "dev": "next dev",
+                "build": "next build",
+                "start": "next start",
             },
-            indent=2,
-        ),
-        encoding="utf-8",
+            "dependencies": {
+                "next": "14.1.0",
+                "react": "18.2.0",
+                "react-dom": "18.2.0",
+                "tailwindcss": "^3.4.0",
+                "autoprefixer": "^10.4.17",
+                "postcss": "^8.4.35"
+            }
+        },
+        indent=2,
     )
 
-    (template_dir / "next.config.mjs").write_text(
-        "export default { reactStrictMode: true }\n",
-        encoding="utf-8",
-    )
+    files["next.config.mjs"] = "export default { reactStrictMode: true }\n"
 
-    (template_dir / "postcss.config.js").write_text(
-        "module.exports = { plugins: { tailwindcss: {}, autoprefixer: {} } }\n",
-        encoding="utf-8",
-    )
+    files["postcss.config.js"] = "module.exports = { plugins: { tailwindcss: {}, autoprefixer: {} } }\n"
 
-    (template_dir / "tailwind.config.js").write_text(
-        (
-            "module.exports = { content: ['./app/**/*.{ts,tsx}', './components/**/*.{ts,tsx}', './pages/**/*.{ts,tsx}', './public/**/*.html'], theme: { extend: {} }, plugins: [] }\n"
-        ),
-        encoding="utf-8",
-    )
+    files["tailwind.config.js"] = "module.exports = { content: ['./app/**/*.{ts,tsx}', './components/**/*.{ts,tsx}', './pages/**/*.{ts,tsx}', './public/**/*.html'], theme: { extend: {} }, plugins: [] }\n"
 
-    (template_dir / "styles" / "globals.css").write_text(
-        "@tailwind base;\n@tailwind components;\n@tailwind utilities;\nbody{ @apply bg-zinc-900 text-zinc-100;}\n",
-        encoding="utf-8",
-    )
+    files["styles/globals.css"] = "@tailwind base;\n@tailwind components;\n@tailwind utilities;\nbody{ @apply bg-zinc-900 text-zinc-100;}\n"
 
-    (template_dir / "app" / "layout.tsx").write_text(
-        (
-            "export default function RootLayout({ children }: { children: React.ReactNode }) {\n"
-            "  return (<html lang=\"en\"><body className=\"min-h-screen bg-zinc-900 text-zinc-100\">{children}</body></html>);}\n"
-        ),
-        encoding="utf-8",
+    files["app/layout.tsx"] = (
+        "export default function RootLayout({ children }: { children: React.ReactNode }) {\n"
+        "  return (<html lang=\"en\"><body className=\"min-h-screen bg-zinc-900 text-zinc-100\">{children}</body></html>);}\n"
     )
 
-    (template_dir / "app" / "page.tsx").write_text(
-        (
-            "'use client'\n\n"
-            "import { useEffect, useState } from 'react'\n\n"
-            "export default function Page(){\n"
-            "  const [spec, setSpec] = useState<any>(null)\n"
-            "  useEffect(()=>{ fetch('/spec.json').then(r=>r.json()).then(setSpec) },[])\n"
-            "  if(!spec) return <div className='p-8'>Loading…</div>\n"
-            "  return (\n"
-            "    <main className='max-w-3xl mx-auto p-8 space-y-6'>\n"
-            "      <h1 className='text-4xl font-bold'>{spec.title}</h1>\n"
-            "      <p className='text-zinc-300'>{spec.description}</p>\n"
-            "      <a href={spec.cta?.href || '#'} className='inline-block px-4 py-2 bg-emerald-500 text-black rounded-md'>\n"
-            "        {spec.cta?.label || 'Get Started'}\n"
-            "      </a>\n"
-            "      <section>\n"
-            "        <h2 className='text-2xl font-semibold mb-2'>Features</h2>\n"
-            "        <ul className='list-disc pl-6 space-y-1'>\n"
-            "          {(spec.features||[]).map((f:string,i:number)=>(<li key={i}>{f}</li>))}\n"
-            "        </ul>\n"
-            "      </section>\n"
-            "    </main>\n"
-            "  )\n"
-            "}\n"
-        ),
-        encoding="utf-8",
+    files["app/page.tsx"] = (
+        "'use client'\n\n"
+        "import { useEffect, useState } from 'react'\n\n"
+        "export default function Page(){\n"
+        "  const [spec, setSpec] = useState<any>(null)\n"
+        "  useEffect(()=>{ fetch('/spec.json').then(r=>r.json()).then(setSpec) },[])\n"
+        "  if(!spec) return <div className='p-8'>Loading…</div>\n"
+        "  return (\n"
+        "    <main className='max-w-3xl mx-auto p-8 space-y-6'>\n"
+        "      <h1 className='text-4xl font-bold'>{spec.title}</h1>\n"
+        "      <p className='text-zinc-300'>{spec.description}</p>\n"
+        "      <a href={spec.cta?.href || '#'} className='inline-block px-4 py-2 bg-emerald-500 text-black rounded-md'>\n"
+        "        {spec.cta?.label || 'Get Started'}\n"
+        "      </a>\n"
+        "      <section>\n"
+        "        <h2 className='text-2xl font-semibold mb-2'>Features</h2>\n"
+        "        <ul className='list-disc pl-6 space-y-1'>\n"
+        "          {(spec.features||[]).map((f:string,i:number)=>(<li key={i}>{f}</li>))}\n"
+        "        </ul>\n"
+        "      </section>\n"
+        "    </main>\n"
+        "  )\n"
+        "}\n"
     )
 
     # Spec file
-    (template_dir / "public" / "spec.json").write_text(json.dumps(spec, indent=2), encoding="utf-8")
-
-    # Zip it
-    zip_path = proj_dir / "prototype.zip"
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for root, _, files in os.walk(template_dir):
-            for f in files:
-                abs_path = Path(root) / f
-                rel = abs_path.relative_to(template_dir)
-                zf.write(abs_path, arcname=str(rel))
-
-    # cleanup template_dir
-    shutil.rmtree(template_dir, ignore_errors=True)
-    return zip_path
+    files["public/spec.json"] = json.dumps(spec, indent=2)
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, text in files.items():
+            zf.writestr(name, text)
+    return buf.getvalue()
+
+
+def generate_prototype_zip(project_id: int, spec: Dict, storage: ArtifactStorage) -> Path:
+    return storage.save(project_id, "prototype.zip", prototype_zip_bytes(spec))
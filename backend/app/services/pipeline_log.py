@@ -0,0 +1,251 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import anyio
+
+LOG_NAME = "pipeline.log"
+LOG_FLUSH_INTERVAL = float(os.getenv("PIPELINE_LOG_FLUSH_INTERVAL", "1.0"))
+LOG_BUFFER_LINES = int(os.getenv("PIPELINE_LOG_BUFFER_LINES", "64"))
+LOG_MAX_BYTES = int(os.getenv("PIPELINE_LOG_MAX_BYTES", str(1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("PIPELINE_LOG_BACKUPS", "2"))
+# Entries kept in memory while the file can't be written (e.g. a full disk); the oldest go first
+LOG_MAX_PENDING = LOG_BUFFER_LINES * 16
+
+log = logging.getLogger(__name__)
+
+_registry: "weakref.WeakValueDictionary[str, PipelineLogger]" = weakref.WeakValueDictionary()
+_registry_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+class PipelineLogger:
+    """Buffered JSON-lines logger writing to `<work_dir>/pipeline.log`.
+
+    Entries are kept in memory and appended in batches: when the buffer fills up,
+    when `flush()`/`close()` is called, or by a shared background flusher every
+    `PIPELINE_LOG_FLUSH_INTERVAL` seconds. The file is rotated once it would grow
+    past `PIPELINE_LOG_MAX_BYTES`, keeping `PIPELINE_LOG_BACKUPS` old files.
+
+    Write errors never reach the caller: entries stay buffered (up to
+    LOG_MAX_PENDING) and are retried on the next flush.
+    """
+
+    def __init__(self, work_dir: Path, project_id: Optional[int] = None):
+        self.path = Path(work_dir) / LOG_NAME
+        self.project_id = project_id
+        self._buf: List[str] = []
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self._failing = False
+
+    def __call__(self, msg: str, **fields) -> None:
+        self.log(msg, **fields)
+
+    def bind(self, stage: str) -> "BoundLogger":
+        return BoundLogger(self, stage)
+
+    def log(self, msg: str, level: str = "info", stage: Optional[str] = None, **fields) -> None:
+        entry = {"ts": datetime.utcnow().isoformat() + "Z", "level": level}
+        if self.project_id is not None:
+            entry["project_id"] = self.project_id
+        if stage:
+            entry["stage"] = stage
+        entry["msg"] = msg
+        entry.update(fields)
+        line = json.dumps(entry, default=str, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buf.append(line)
+            full = len(self._buf) >= LOG_BUFFER_LINES
+        if full:
+            self.flush()
+
+    def error(self, msg: str, **fields) -> None:
+        self.log(msg, level="error", **fields)
+
+    def flush(self) -> bool:
+        """Append buffered entries to the file; False (entries kept) if it can't be written."""
+        with self._lock:
+            if not self._buf:
+                return True
+            lines = self._buf
+            if self._dropped:
+                note = {"ts": datetime.utcnow().isoformat() + "Z", "level": "error", "msg": "Log entries dropped", "count": self._dropped}
+                lines = [json.dumps(note) + "\n"] + lines
+            data = "".join(lines).encode("utf-8")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    size = self.path.stat().st_size
+                except FileNotFoundError:
+                    size = 0
+                if size and size + len(data) > LOG_MAX_BYTES:
+                    self._rotate()
+                with open(self.path, "ab") as f:
+                    f.write(data)
+            except OSError:
+                if not self._failing:
+                    log.warning("cannot write %s; keeping entries in memory", self.path, exc_info=True)
+                self._failing = True
+                if len(self._buf) > LOG_MAX_PENDING:
+                    self._dropped += len(self._buf) - LOG_MAX_PENDING
+                    del self._buf[:-LOG_MAX_PENDING]
+                return False
+            self._buf.clear()
+            self._dropped = 0
+            self._failing = False
+            return True
+
+    def close(self) -> None:
+        self.flush()
+
+    def _rotate(self) -> None:
+        if LOG_BACKUPS <= 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for i in range(LOG_BACKUPS - 1, 0, -1):
+            src = self.path.with_name(f"{LOG_NAME}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{LOG_NAME}.{i + 1}"))
+        os.replace(self.path, self.path.with_name(f"{LOG_NAME}.1"))
+
+
+class BoundLogger:
+    """Callable view of a PipelineLogger that tags every entry with a stage."""
+
+    def __init__(self, parent: PipelineLogger, stage: str):
+        self.parent = parent
+        self.stage = stage
+
+    def __call__(self, msg: str, **fields) -> None:
+        self.parent.log(msg, stage=self.stage, **fields)
+
+    def error(self, msg: str, **fields) -> None:
+        self.parent.log(msg, level="error", stage=self.stage, **fields)
+
+
+def get_logger(work_dir: Path, project_id: Optional[int] = None) -> PipelineLogger:
+    """Return the live logger for a project directory, creating it if needed."""
+    key = str(Path(work_dir).resolve())
+    with _registry_lock:
+        logger = _registry.get(key)
+        if logger is None:
+            logger = PipelineLogger(work_dir, project_id=project_id)
+            _registry[key] = logger
+    _start_flusher()
+    return logger
+
+
+def flush_logger(work_dir: Path) -> None:
+    """Flush pending entries of a live logger so readers see them."""
+    logger = _registry.get(str(Path(work_dir).resolve()))
+    if logger is not None:
+        logger.flush()
+
+
+def _start_flusher() -> None:
+    global _flusher
+    if _flusher is not None:
+        return
+    with _registry_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="pipeline-log-flusher", daemon=True)
+            _flusher.start()
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(LOG_FLUSH_INTERVAL)
+        for logger in list(_registry.values()):
+            try:
+                logger.flush()
+            except Exception:
+                log.exception("pipeline log flush failed")
+
+
+def _parse(line: bytes) -> Dict:
+    text = line.decode("utf-8", errors="replace").rstrip("\n")
+    try:
+        return json.loads(text)
+    except ValueError:
+        # Plain-text lines written before the structured format
+        return {"msg": text}
+
+
+def read_tail(path: Path, lines: int = 200, end: Optional[int] = None) -> List[Dict]:
+    """Return the last `lines` entries by reading backwards from the end of the file
+    (or from byte offset `end`)."""
+    if lines <= 0 or not path.exists():
+        return []
+    block = 8192
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell() if end is None else min(end, f.tell())
+        data = b""
+        while pos > 0 and data.count(b"\n") <= lines:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return [_parse(ln) for ln in data.splitlines()[-lines:] if ln.strip()]
+
+
+def _read_new(path: Path, ino: Optional[int], offset: int) -> Tuple[Optional[int], int, bytes, bool]:
+    """(inode, new offset, bytes appended past `offset`, whether the file was replaced or truncated)."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return ino, offset, b"", False
+    reset = st.st_ino != ino or st.st_size < offset
+    if reset:
+        ino, offset = st.st_ino, 0
+    if st.st_size <= offset:
+        return ino, offset, b"", reset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read(st.st_size - offset)
+    return ino, offset + len(chunk), chunk, reset
+
+
+async def follow(path: Path, lines: int = 200, poll: float = 0.5, stop=lambda: False) -> AsyncIterator[Dict]:
+    """Yield the last `lines` entries, then new entries as they are appended.
+
+    Only the bytes past the last read offset are read on each poll; a shrinking
+    file or a new inode (rotation) restarts from the beginning of the new file.
+    Ends once `stop()` returns True and no more data is pending; `stop` is only
+    consulted while the file is idle. Reads and `stop()` run in worker threads
+    and the poll sleeps on the event loop, so an idle follower holds no thread.
+    """
+    try:
+        st = await anyio.to_thread.run_sync(path.stat)
+        ino, offset = st.st_ino, st.st_size
+    except FileNotFoundError:
+        ino, offset = None, 0
+    for entry in await anyio.to_thread.run_sync(functools.partial(read_tail, path, lines, end=offset)):
+        yield entry
+    partial = b""
+    draining = False
+    while True:
+        ino, offset, chunk, reset = await anyio.to_thread.run_sync(_read_new, path, ino, offset)
+        if reset:
+            partial = b""
+        if chunk:
+            *complete, partial = (partial + chunk).split(b"\n")
+            for ln in complete:
+                if ln.strip():
+                    yield _parse(ln)
+            continue
+        if draining:
+            return
+        if await anyio.to_thread.run_sync(stop):
+            # One more pass to pick up anything flushed while deciding to stop
+            draining = True
+            continue
+        await anyio.sleep(poll)
@@ -0,0 +1,272 @@
+import functools
+import hmac
+import inspect
+import json
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from fastapi.routing import APIRoute
+
+# Opt-in sampling profiler. With ADMIN_TOKEN set, a request carrying `X-Profile: 1`
+# (or `speedscope`) and a matching `X-Admin-Token` is sampled; PROFILE_PIPELINE_RATE
+# samples that fraction of run_pipeline executions. Profiles are flame-graph input
+# (collapsed stacks, or speedscope JSON) written under a `profiles/` directory: the
+# project's own for /api/projects/{id}/... requests and pipeline runs, the project-less
+# artifacts directory's otherwise. With neither setting, nothing is installed or checked.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_PIPELINE_RATE = float(os.getenv("PROFILE_PIPELINE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000.0
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "collapsed").lower()  # collapsed | speedscope
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))  # per profiles/ directory
+PROFILES_DIR = "profiles"
+FORMATS = {"collapsed": ".folded", "speedscope": ".speedscope.json"}
+
+_PROJECT_PATH = re.compile(r"^/api/projects/(\d+)(?:/|$)")
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+# A thread whose innermost Python frame is in one of these is blocked, not working
+_IDLE_FILES = {"threading.py", "queue.py", "selectors.py"}
+_IDLE_THREADS = {"artifact-gc", "pipeline-log-flusher", "profile-sampler"}
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def requested_format(value: Optional[str]) -> Optional[str]:
+    """Format asked for by an X-Profile header value, or None if profiling wasn't asked for."""
+    value = (value or "").strip().lower()
+    if value in FORMATS:
+        return value
+    if value in ("1", "true", "yes"):
+        return PROFILE_FORMAT
+    return None
+
+
+def sample_pipeline() -> bool:
+    return PROFILE_PIPELINE_RATE > 0 and random.random() < PROFILE_PIPELINE_RATE
+
+
+def project_for_path(path: str) -> Optional[int]:
+    m = _PROJECT_PATH.match(path)
+    return int(m.group(1)) if m else None
+
+
+_labels: Dict[object, str] = {}
+
+
+def _label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        parts = Path(code.co_filename).parts[-2:]
+        label = _labels[code] = f"{code.co_name} ({'/'.join(parts)}:{code.co_firstlineno})"
+    return label
+
+
+def _idle(frame) -> bool:
+    return os.path.basename(frame.f_code.co_filename) in _IDLE_FILES or (
+        frame.f_code.co_name == "_worker" and frame.f_code.co_filename.endswith(os.path.join("futures", "thread.py"))
+    )
+
+
+class Sampler:
+    """Samples Python stacks every `interval` seconds from a background thread.
+
+    `threads` limits sampling to those thread idents (threads can join later, see
+    attached()); by default every busy thread is sampled. Stacks are rooted at the
+    thread name. `skip_idle` drops threads blocked in waits (default: when sampling
+    every thread).
+    """
+
+    def __init__(self, threads: Optional[Iterable[int]] = None, interval: Optional[float] = None, skip_idle: Optional[bool] = None):
+        self.threads: Optional[Set[int]] = set(threads) if threads is not None else None
+        self.skip_idle = threads is None if skip_idle is None else skip_idle
+        self.interval = interval or PROFILE_INTERVAL
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Sampler":
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def __enter__(self) -> "Sampler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (self.threads is not None and ident not in self.threads):
+                    continue
+                if ident not in names:
+                    names.update((t.ident, t.name) for t in threading.enumerate() if t.ident is not None)
+                name = names.get(ident, str(ident))
+                if self.skip_idle and (name in _IDLE_THREADS or _idle(frame)):
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(name)
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+
+# Sampler of the request being profiled; copied into threadpool workers with the context
+_request_sampler: ContextVar[Optional[Sampler]] = ContextVar("request_sampler", default=None)
+
+
+@contextmanager
+def attached() -> Iterator[None]:
+    """Sample the calling thread while it works for the request being profiled, if any."""
+    sampler = _request_sampler.get()
+    ident = threading.get_ident()
+    if sampler is None or sampler.threads is None or ident in sampler.threads:
+        yield
+        return
+    sampler.threads.add(ident)
+    try:
+        yield
+    finally:
+        sampler.threads.discard(ident)
+
+
+def traced(func: Callable) -> Callable:
+    """Wrap a sync function so the thread running it joins the request's profile."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with attached():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose sync endpoints join the request's profile from their threadpool worker."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if inspect.isfunction(endpoint) and not inspect.iscoroutinefunction(endpoint):
+            endpoint = traced(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's folded format: `root;child;leaf count` per line."""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def speedscope(stacks: Counter, name: str, interval: float) -> Dict:
+    """speedscope file with one sampled profile per thread; weights in milliseconds."""
+    frames: List[Dict] = []
+    index: Dict[str, int] = {}
+    by_thread: Dict[str, Tuple[List[List[int]], List[float]]] = {}
+    for stack, count in sorted(stacks.items()):
+        ids = []
+        for label in stack[1:]:
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            ids.append(index[label])
+        samples, weights = by_thread.setdefault(stack[0], ([], []))
+        samples.append(ids)
+        weights.append(count * interval * 1000.0)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "mvp-backend",
+        "shared": {"frames": frames},
+        "profiles": [
+            {"type": "sampled", "name": thread, "unit": "milliseconds", "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights}
+            for thread, (samples, weights) in sorted(by_thread.items())
+        ],
+    }
+
+
+def profile_name(label: str, fmt: Optional[str] = None) -> str:
+    fmt = fmt or PROFILE_FORMAT
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{_UNSAFE.sub('-', label).strip('-')}{FORMATS.get(fmt, '.folded')}"
+
+
+def write_profile(directory: Path, name: str, sampler: Sampler, fmt: Optional[str] = None) -> Path:
+    """Write the sampler's stacks to `directory` and keep only the newest PROFILE_KEEP there."""
+    directory.mkdir(parents=True, exist_ok=True)
+    if (fmt or PROFILE_FORMAT) == "speedscope":
+        body = json.dumps(speedscope(sampler.stacks, name, sampler.interval))
+    else:
+        body = collapsed(sampler.stacks)
+    path = directory / name
+    tmp = directory / f".{name}.tmp"
+    tmp.write_text(body, encoding="utf-8")
+    os.replace(tmp, path)
+    for old in list_profiles(directory)[PROFILE_KEEP:]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def list_profiles(directory: Path) -> List[Path]:
+    """Profiles in a directory, newest first."""
+    if not directory.is_dir():
+        return []
+    return sorted((p for p in directory.iterdir() if p.is_file() and not p.name.startswith(".")), key=lambda p: p.name, reverse=True)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling admin-requested requests.
+
+    Only added to the app when ADMIN_TOKEN is set. Only the threads serving the
+    request are sampled: the event loop's, plus threads that join through attached()
+    (sync endpoints via ProfiledRoute, background tasks decorated with traced()).
+    Background tasks run inside the request's ASGI call, so a profiled POST
+    /api/projects includes its pipeline.
+    """
+
+    def __init__(self, app, profiles_dir: Callable[[Optional[int]], Path]):
+        self.app = app
+        self.profiles_dir = profiles_dir  # project id (or None) -> directory to write to
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = {k: v for k, v in scope["headers"] if k in (b"x-profile", b"x-admin-token")}
+        fmt = requested_format(headers.get(b"x-profile", b"").decode("latin-1"))
+        if fmt is None or not is_admin(headers.get(b"x-admin-token", b"").decode("latin-1")):
+            return await self.app(scope, receive, send)
+
+        import anyio
+
+        project_id = project_for_path(scope["path"])
+        name = profile_name(f"{scope['method']}-{scope['path']}", fmt)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", name.encode())]
+            await send(message)
+
+        sampler = Sampler(threads=[threading.get_ident()], skip_idle=True).start()
+        token = _request_sampler.set(sampler)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _request_sampler.reset(token)
+            sampler.stop()
+            await anyio.to_thread.run_sync(lambda: write_profile(self.profiles_dir(project_id), name, sampler, fmt))
@@ -0,0 +1,181 @@
+import html
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from ..models import Project
+
+# Full-text search over titles, transcripts and specs, backed by an SQLite FTS5 table
+# keyed by project id (created in database.init_db). Rows are upserted by the pipeline
+# as the transcript and spec are written; `python -m app.services.search rebuild`
+# backfills projects processed before the index existed.
+FTS_TABLE = "project_fts"
+RANK_WEIGHTS = (10.0, 1.0, 4.0)  # bm25 weights for title, transcript, spec
+SNIPPET_TOKENS = 24
+# Queries matching more projects than this rank only the newest RANK_WINDOW of them,
+# and results can be paged up to that depth
+RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "1000"))
+COUNT_LIMIT = int(os.getenv("SEARCH_COUNT_LIMIT", "10000"))
+SNIPPET_MARK = ("<mark>", "</mark>")
+# snippet() marks matches with control characters; the text is HTML-escaped before they become <mark> tags
+_RAW_MARK = ("\x02", "\x03")
+_TERM = re.compile(r"\w+", re.UNICODE)
+_available: Optional[bool] = None
+
+HIT_COLUMNS = (
+    Project.id,
+    Project.youtube_url,
+    Project.title,
+    Project.status,
+    Project.mvp_viability,
+    Project.viability_score,
+    Project.created_at,
+)
+
+
+def available(session: Session) -> bool:
+    """True when the FTS5 table exists (SQLite only; checked once per process)."""
+    global _available
+    if _available is None:
+        conn = session.connection()
+        _available = conn.dialect.name == "sqlite" and conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).first() is not None
+    return _available
+
+
+def match_expression(q: str) -> str:
+    """User input → FTS5 query: every word must match; operators and quotes are not interpreted."""
+    return " ".join(f'"{term}"' for term in _TERM.findall(q))
+
+
+def highlight(raw: str) -> str:
+    """HTML-escape an FTS5 snippet and turn its match markers into SNIPPET_MARK tags."""
+    text = html.escape(raw, quote=False)
+    return text.replace(_RAW_MARK[0], SNIPPET_MARK[0]).replace(_RAW_MARK[1], SNIPPET_MARK[1])
+
+
+def spec_text(spec) -> str:
+    """Flatten a spec (dict or JSON string) into its string values."""
+    if isinstance(spec, str):
+        try:
+            spec = json.loads(spec)
+        except ValueError:
+            return spec
+    out: List[str] = []
+    stack = [spec]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            out.append(node)
+        elif isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return "\n".join(out)
+
+
+def index_project(session: Session, project_id: int, title: Optional[str], transcript: str, spec=None) -> None:
+    """Insert or replace a project's row. Committed with the caller's transaction."""
+    if not available(session):
+        return
+    session.connection().exec_driver_sql(
+        f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, transcript, spec) VALUES (?, ?, ?, ?)",
+        (project_id, title or "", transcript, spec_text(spec) if spec is not None else ""),
+    )
+
+
+def search(session: Session, q: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[Dict]]:
+    """(total matches, one page of hits ranked by bm25, best first).
+
+    Scoring every match of a common term costs ~1.5µs a row, so only the newest
+    RANK_WINDOW matches are ranked; below that the ranking is exact. The window
+    doesn't depend on the page, so pages never overlap; offsets at or past
+    RANK_WINDOW return no hits. The total is counted up to COUNT_LIMIT.
+    """
+    expr = match_expression(q)
+    if not expr or not available(session):
+        return 0, []
+    conn = session.connection()
+    weights = ", ".join(str(w) for w in RANK_WEIGHTS)
+    window = RANK_WINDOW
+    # rowid order streams straight from the index and stops at the LIMIT
+    newest = conn.exec_driver_sql(
+        f"SELECT rowid, -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? "
+        f"ORDER BY rowid DESC LIMIT ?",
+        (expr, window + 1),
+    ).all()
+    if len(newest) <= window:
+        total = len(newest)
+    else:
+        newest = newest[:window]
+        total = conn.exec_driver_sql(
+            f"SELECT count(*) FROM (SELECT 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? LIMIT ?)",
+            (expr, COUNT_LIMIT),
+        ).scalar() or 0
+    # rowid breaks score ties, so every page sees the same order
+    page = sorted(newest, key=lambda row: (-row[1], -row[0]))[offset:offset + limit]
+    if not page:
+        return total, []
+    # Snippets are built in a second pass so only the page's rows are highlighted, not every match
+    scores = dict(page)
+    placeholders = ", ".join("?" * len(scores))
+    snippets = dict(conn.exec_driver_sql(
+        f"SELECT rowid, snippet({FTS_TABLE}, -1, ?, ?, '…', {SNIPPET_TOKENS}) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH ? AND rowid IN ({placeholders})",
+        (*_RAW_MARK, expr, *scores),
+    ).all())
+    projects = session.exec(select(*HIT_COLUMNS).where(Project.id.in_(list(scores)))).all()  # type: ignore[attr-defined]
+    hits = [dict(row._mapping, score=scores[row.id], snippet=highlight(snippets.get(row.id, ""))) for row in projects]
+    hits.sort(key=lambda hit: (-hit["score"], -hit["id"]))
+    return total, hits
+
+
+def _documents(session: Session, storage) -> Iterable[Tuple[int, Optional[str], str, Optional[str]]]:
+    stmt = select(Project.id, Project.title, Project.transcript_path, Project.spec_path).where(
+        Project.transcript_path.is_not(None)  # type: ignore[union-attr]
+    )
+    for pid, title, transcript_path, spec_path in session.exec(stmt).all():
+        try:
+            transcript = storage.read_text(transcript_path)
+        except FileNotFoundError:
+            continue
+        try:
+            spec = storage.read_text(spec_path) if spec_path else None
+        except FileNotFoundError:
+            spec = None
+        yield pid, title, transcript, spec
+
+
+def rebuild(session: Session, storage, batch_size: int = 500) -> int:
+    """Re-index every project with a transcript on disk, replacing the table's contents."""
+    if not available(session):
+        raise RuntimeError(f"{FTS_TABLE} does not exist; run init_db() on an SQLite database first")
+    conn = session.connection()
+    conn.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+    count = 0
+    for pid, title, transcript, spec in _documents(session, storage):
+        index_project(session, pid, title, transcript, spec)
+        count += 1
+        if count % batch_size == 0:
+            session.commit()
+    # Merge the b-tree segments written by incremental inserts; queries touch fewer pages
+    session.connection().exec_driver_sql(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    session.commit()
+    return count
+
+
+if __name__ == "__main__":
+    # python -m app.services.search rebuild
+    from ..database import engine, init_db
+    from ..main import storage as _storage
+
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.services.search rebuild")
+    init_db()
+    with Session(engine) as _session:
+        print(f"indexed {rebuild(_session, _storage)} projects")
@@ -0,0 +1,409 @@
+import abc
+import gzip
+import json
+import os
+import re
+import threading
+import shutil
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import Session, func, select
+
+from ..models import Artifact, Project
+
+# Artifact kinds, derived from file names inside a project directory
+REGENERABLE_KINDS = {"prototype_zip", "template"}  # rebuildable from spec.json
+
+# Default retention per kind; None keeps forever, 0 deletes as soon as unused.
+# Override with ARTIFACT_RETENTION="prototype_zip=30d,log=7d,upload=90d" (s/m/h/d units).
+DEFAULT_RETENTION: Dict[str, Optional[timedelta]] = {
+    "audio": timedelta(0),
+    "template": timedelta(0),
+    "log": timedelta(days=30),
+    "prototype_zip": None,
+    "transcript": None,
+    "spec": None,
+    "upload": None,
+    "profile": timedelta(days=7),
+    "unattached": timedelta(days=7),  # zips from /api/generate-prototype without a project
+}
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_retention(raw: str) -> Dict[str, Optional[timedelta]]:
+    policy = dict(DEFAULT_RETENTION)
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        kind, value = (x.strip() for x in item.split("=", 1))
+        if value.lower() in ("", "none", "forever"):
+            policy[kind] = None
+            continue
+        m = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd]?)", value.lower())
+        if m:
+            policy[kind] = timedelta(seconds=float(m.group(1)) * _UNITS[m.group(2) or "s"])
+    return policy
+
+
+RETENTION = parse_retention(os.getenv("ARTIFACT_RETENTION", ""))
+ARTIFACTS_QUOTA_BYTES = int(float(os.getenv("ARTIFACTS_QUOTA_MB", "900")) * 1024 * 1024)
+
+# Transcripts and specs are stored as `<name>.gz` and decompressed transparently by
+# read_bytes()/read_text() and the /downloads handler. ARTIFACT_COMPRESSION=none disables.
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "gzip").lower()
+COMPRESSED_KINDS = {"transcript", "spec"}
+COMPRESSED_SUFFIX = ".gz"
+COMPRESS_LEVEL = int(os.getenv("ARTIFACT_COMPRESS_LEVEL", "6"))
+# Directory id for artifacts generated without a project; never treated as an orphan
+UNATTACHED_ID = 0
+INDEX_NAME = "index.json"  # per project: original vs stored size of compressed artifacts
+# User uploads live in their own subdirectory so their names can't be mistaken for (or
+# overwrite) pipeline files, which retention and eviction recognise by name
+UPLOADS_DIR = "uploads"
+_PIPELINE_NAMES = re.compile(r"^(pipeline\.log.*|transcript\..*|spec\..*|audio\..*|prototype\.zip|index\.json|profiles|template|uploads)$", re.I)
+
+
+def upload_name_error(name: str) -> Optional[str]:
+    """Why `name` can't be used for an upload, or None if it can."""
+    if not name or name != Path(name).name or name.startswith("."):
+        return "Invalid file name"
+    if _PIPELINE_NAMES.match(name):
+        return f"'{name}' is reserved for pipeline artifacts"
+    return None
+
+
+def classify(path: Path) -> str:
+    name = path.name
+    if name.startswith("audio."):
+        return "audio"
+    if name.startswith("pipeline.log"):
+        return "log"
+    if name.startswith("transcript."):
+        return "transcript"
+    if name.startswith("spec."):
+        return "spec"
+    if name == "prototype.zip":
+        return "prototype_zip"
+    if name == "template":
+        return "template"
+    if name == INDEX_NAME:
+        return "index"
+    if name == UPLOADS_DIR:
+        return "upload"
+    if name == "profiles":
+        return "profile"
+    return "upload"
+
+
+class ArtifactStorage(abc.ABC):
+    """Where pipeline outputs and uploads live.
+
+    Paths handed out are stable identifiers persisted on Project/Artifact rows.
+    """
+
+    @abc.abstractmethod
+    def project_dir(self, project_id: int) -> Path:
+        ...
+
+    @abc.abstractmethod
+    def save(self, project_id: int, name: str, data: bytes, compress: bool = False) -> Path:
+        ...
+
+    def write_text(self, project_id: int, name: str, text: str, compress: bool = False) -> Path:
+        return self.save(project_id, name, text.encode("utf-8"), compress=compress)
+
+    @abc.abstractmethod
+    def save_upload(self, project_id: int, name: str, data: bytes) -> Path:
+        """Store a user upload under `<project>/uploads/`; ValueError for unusable names."""
+
+    @abc.abstractmethod
+    def read_bytes(self, path) -> bytes:
+        """Contents of a stored artifact, decompressed if it was stored compressed."""
+
+    def read_text(self, path) -> str:
+        return self.read_bytes(path).decode("utf-8")
+
+    @abc.abstractmethod
+    def delete(self, path: Path) -> int:
+        ...
+
+    @abc.abstractmethod
+    def relpath(self, path) -> str:
+        """Path of a stored artifact relative to the storage root."""
+
+    def url_path(self, path) -> str:
+        """relpath() as served: compressed transcripts/specs keep their plain name in URLs."""
+        rel = self.relpath(path)
+        if rel.endswith(COMPRESSED_SUFFIX) and classify(Path(rel)) in COMPRESSED_KINDS:
+            return rel[: -len(COMPRESSED_SUFFIX)]
+        return rel
+
+    @abc.abstractmethod
+    def usage(self, refresh: bool = False) -> int:
+        """Bytes stored: a running total, or recounted from disk with `refresh`."""
+
+    @abc.abstractmethod
+    def entries(self) -> Iterable[Tuple[int, Path]]:
+        """Yield (project_id, path) for every top-level entry of each project dir."""
+
+    @abc.abstractmethod
+    def expired(self, path: Path, now: Optional[float] = None) -> bool:
+        """Whether the retention policy for this artifact's kind has elapsed."""
+
+
+class LocalStorage(ArtifactStorage):
+    """Artifacts under `<root>/<project_id>/` on the local (Render) disk.
+
+    Usage is counted once, then kept up to date by save()/delete(). Logs,
+    audio and profiles are written elsewhere, so collect_garbage() recounts it.
+    """
+
+    def __init__(self, root: Path, quota_bytes: int = ARTIFACTS_QUOTA_BYTES, retention=None):
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.retention = retention if retention is not None else RETENTION
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._prefix = str(self.root) + os.sep
+        self._index_lock = threading.Lock()
+        self._usage_lock = threading.Lock()
+        self._used: Optional[int] = None
+
+    def project_dir(self, project_id: int) -> Path:
+        d = self.root / str(project_id)
+        d.mkdir(parents=True, exist_ok=True)
+        return d
+
+    def save(self, project_id: int, name: str, data: bytes, compress: bool = False) -> Path:
+        # Never let a client-supplied name escape the project directory
+        dest = self.project_dir(project_id) / Path(name).name
+        if compress and ARTIFACT_COMPRESSION == "gzip":
+            plain = dest
+            dest = dest.with_name(dest.name + COMPRESSED_SUFFIX)
+            stored = gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+            self._write(dest, stored)
+            # An older uncompressed copy would shadow this one in /downloads
+            plain.unlink(missing_ok=True)
+            self._record_sizes(project_id, plain.name, len(data), len(stored))
+            return dest
+        self._write(dest, data)
+        return dest
+
+    def save_upload(self, project_id: int, name: str, data: bytes) -> Path:
+        error = upload_name_error(name)
+        if error:
+            raise ValueError(error)
+        dest = self.project_dir(project_id) / UPLOADS_DIR / name
+        dest.parent.mkdir(exist_ok=True)
+        self._write(dest, data)
+        return dest
+
+    def _write(self, dest: Path, data: bytes) -> None:
+        replaced = _size(dest)
+        tmp = dest.with_name(f".{dest.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, dest)
+        self._account(len(data) - replaced)
+
+    def _account(self, delta: int) -> None:
+        with self._usage_lock:
+            if self._used is not None:
+                self._used += delta
+
+    def _record_sizes(self, project_id: int, name: str, original: int, stored: int) -> None:
+        with self._index_lock:
+            index = self.size_index(project_id)
+            index[name] = {"encoding": "gzip", "original_bytes": original, "stored_bytes": stored}
+            self._write(self.project_dir(project_id) / INDEX_NAME, json.dumps(index, indent=2).encode("utf-8"))
+
+    def size_index(self, project_id: int) -> Dict[str, Dict]:
+        """{name: {encoding, original_bytes, stored_bytes}} for compressed artifacts of a project."""
+        try:
+            return json.loads((self.root / str(project_id) / INDEX_NAME).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def read_bytes(self, path) -> bytes:
+        path = Path(path)
+        if path.name.endswith(COMPRESSED_SUFFIX) and classify(path) in COMPRESSED_KINDS:
+            return gzip.decompress(path.read_bytes())
+        if not path.exists():
+            packed = path.with_name(path.name + COMPRESSED_SUFFIX)
+            if packed.exists():
+                return gzip.decompress(packed.read_bytes())
+        return path.read_bytes()
+
+    def relpath(self, path) -> str:
+        # Plain string slicing: this runs per artifact on every project listing
+        path = str(path)
+        if path.startswith(self._prefix):
+            rel = path[len(self._prefix):]
+            return rel if os.sep == "/" else rel.replace(os.sep, "/")
+        return Path(path).relative_to(self.root).as_posix()
+
+    def delete(self, path: Path) -> int:
+        path = Path(path)
+        freed = _size(path)
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        self._account(-freed)
+        return freed
+
+    def usage(self, refresh: bool = False) -> int:
+        with self._usage_lock:
+            if refresh or self._used is None:
+                self._used = sum(_size(p) for _, p in self.entries())
+            return self._used
+
+    def entries(self) -> Iterable[Tuple[int, Path]]:
+        for d in self.root.iterdir():
+            if not (d.is_dir() and d.name.isdigit()):
+                continue
+            for p in d.iterdir():
+                yield int(d.name), p
+
+    def expired(self, path: Path, now: Optional[float] = None) -> bool:
+        if path.name.startswith("."):
+            # In-progress atomic write
+            return False
+        kind = classify(path)
+        if kind != "profile" and path.parent.name == str(UNATTACHED_ID):
+            kind = "unattached"
+        ttl = self.retention.get(kind)
+        if ttl is None:
+            return False
+        return (now or time.time()) - _mtime(path) >= ttl.total_seconds()
+
+
+def _size(path: Path) -> int:
+    try:
+        if path.is_dir():
+            return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _last_used(path: Path) -> float:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return 0.0
+    return max(st.st_atime, st.st_mtime)
+
+
+ACTIVE_STATUSES = ("queued", "processing")
+
+
+def _clear_refs(session: Session, project: Optional[Project], path: Path) -> None:
+    """Drop DB references to a deleted file."""
+    if project is not None:
+        for attr in ("caption_path", "transcript_path", "spec_path", "prototype_zip_path"):
+            if getattr(project, attr) == str(path):
+                setattr(project, attr, None)
+                session.add(project)
+    for a in session.exec(select(Artifact).where(Artifact.path == str(path))).all():
+        session.delete(a)
+
+
+def enforce_quota(storage: ArtifactStorage, session: Session, protect: Iterable[Path] = ()) -> List[Path]:
+    """Evict regenerable artifacts, least recently used first, until under quota.
+
+    Cheap while the running total is under quota; the tree is only walked (and the
+    total recounted) when it isn't.
+    """
+    quota = getattr(storage, "quota_bytes", 0)
+    if not quota or storage.usage() <= quota:
+        return []
+    entries = list(storage.entries())
+    used = storage.usage(refresh=True)
+    if used <= quota:
+        return []
+    keep = {str(p) for p in protect}
+    candidates = sorted(
+        ((pid, p) for pid, p in entries if classify(p) in REGENERABLE_KINDS and str(p) not in keep),
+        key=lambda item: _last_used(item[1]),
+    )
+    evicted: List[Path] = []
+    for pid, p in candidates:
+        if used <= quota:
+            break
+        project = session.get(Project, pid)
+        if project is not None and project.status in ACTIVE_STATUSES:
+            continue
+        used -= storage.delete(p)
+        _clear_refs(session, project, p)
+        evicted.append(p)
+    session.commit()
+    return evicted
+
+
+def collect_garbage(storage: ArtifactStorage, session: Session) -> Dict[str, int]:
+    """Reconcile artifact files with Project/Artifact rows.
+
+    - deletes directories of projects that no longer exist (not UNATTACHED_ID's,
+      which only the "unattached" retention cleans up). Nothing is deleted as an
+      orphan while the database has no projects, and directories with ids above
+      the highest project id are kept: both mean the database isn't the one these
+      artifacts belong to (e.g. a fresh SQLite file after a redeploy).
+    - applies per-kind retention (skipping projects with a pipeline in flight)
+    - drops Artifact rows and Project path fields that point at missing files
+    - recounts disk usage and evicts regenerable artifacts if the quota is exceeded
+    """
+    stats = {"orphan_dirs": 0, "orphan_dirs_kept": 0, "expired": 0, "dangling_refs": 0, "evicted": 0, "freed_bytes": 0}
+    now = time.time()
+    projects: Dict[int, Optional[Project]] = {}
+    for pid, p in list(storage.entries()):
+        if pid == UNATTACHED_ID:
+            if storage.expired(p, now):
+                stats["freed_bytes"] += storage.delete(p)
+                stats["expired"] += 1
+            continue
+        if pid not in projects:
+            projects[pid] = session.get(Project, pid)
+        project = projects[pid]
+        if project is None:
+            continue
+        if project.status in ACTIVE_STATUSES:
+            continue
+        if storage.expired(p, now):
+            stats["freed_bytes"] += storage.delete(p)
+            _clear_refs(session, project, p)
+            stats["expired"] += 1
+    max_id = session.exec(select(func.max(Project.id))).one() or 0
+    for pid, project in projects.items():
+        if project is None and pid > max_id:
+            stats["orphan_dirs_kept"] += 1
+        elif project is None:
+            d = storage.project_dir(pid)
+            stats["freed_bytes"] += storage.delete(d)
+            stats["orphan_dirs"] += 1
+
+    for a in session.exec(select(Artifact)).all():
+        if not Path(a.path).exists():
+            session.delete(a)
+            stats["dangling_refs"] += 1
+    for project in session.exec(select(Project).where(Project.status.not_in(ACTIVE_STATUSES))).all():  # type: ignore[attr-defined]
+        for attr in ("caption_path", "transcript_path", "spec_path", "prototype_zip_path"):
+            value = getattr(project, attr)
+            if value and not Path(value).exists():
+                setattr(project, attr, None)
+                session.add(project)
+                stats["dangling_refs"] += 1
+    session.commit()
+
+    storage.usage(refresh=True)
+    stats["evicted"] = len(enforce_quota(storage, session))
+    return stats
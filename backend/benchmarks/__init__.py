@@ -0,0 +1 @@
+"""Offline benchmarks for the pipeline and API (see `python -m benchmarks --help`)."""
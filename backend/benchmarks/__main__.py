@@ -0,0 +1,80 @@
+"""Run the offline benchmark suite.
+
+    python -m benchmarks                         # micro + load, save JSON
+    python -m benchmarks --compare results/x.json
+    python -m benchmarks --latency 0.05 --failure-rate 0.1
+    python -m benchmarks --suite serialization --projects 10000
+    python -m benchmarks --suite compression
+    python -m benchmarks --suite dedupe
+    python -m benchmarks --suite search --projects 100000
+    python -m benchmarks --suite audio
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from .harness import compare, isolate_env, save_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--suite", choices=["all", "micro", "load", "serialization", "compression", "dedupe", "search", "audio"], default="all")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--read-ratio", type=float, default=0.5)
+    parser.add_argument("--projects", type=int, default=10000, help="rows seeded for the serialization and search suites")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every faked upstream call")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability each faked upstream call fails")
+    parser.add_argument("--captions", choices=["manual", "generated", "none"], default="manual")
+    parser.add_argument("--openai", action="store_true", help="exercise the (faked) OpenAI paths")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="baseline results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    isolate_env()
+    from . import audio, compression, dedupe, load, micro, search, serialization
+    from .fakes import SERVICES, FakeConfig, install_fakes
+
+    config = FakeConfig(
+        captions=args.captions,
+        openai=args.openai,
+        latency={s: args.latency for s in SERVICES},
+        failure_rate={s: args.failure_rate for s in SERVICES},
+    )
+    results = {}
+    with install_fakes(config):
+        if args.suite in ("all", "micro"):
+            results["micro"] = micro.run(args.repeat)
+        if args.suite in ("all", "load"):
+            results["load"] = load.run(args.requests, args.concurrency, args.read_ratio)
+        if args.suite == "serialization":
+            # Seeds its own rows, so it is not part of "all"
+            results["serialization"] = serialization.run(args.projects, max(1, args.repeat // 10))
+        if args.suite == "compression":
+            results["compression"] = compression.run()
+        if args.suite == "dedupe":
+            results["dedupe"] = dedupe.run()
+        if args.suite == "search":
+            results["search"] = search.run(args.projects, args.repeat)
+        if args.suite == "audio":
+            results["audio"] = audio.run(config)
+    results["fake_calls"] = {"calls": dict(config.calls)}
+
+    for suite, cases in results.items():
+        for name, stats in cases.items():
+            print(f"{suite}.{name}: " + ", ".join(
+                f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in (stats.items() if isinstance(stats, dict) else [("value", stats)])
+            ))
+    path = save_results(results, args.out)
+    print(f"saved {path}")
+    if args.compare:
+        lines = compare(results, args.compare)
+        print("\n".join(lines))
+        if any("REGRESSION" in ln for ln in lines):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Whisper-fallback audio acquisition: bytes and download time per video, AUDIO_MODE=best vs speech.
+
+yt-dlp is faked: format choice follows the pipeline's selector over YouTube's usual
+audio-only ladder (30-135 kbps), and transfer time is size / `bandwidth`. The
+"best" run has no size cap, as before AUDIO_MAX_MB existed. Fragment
+concurrency is not modelled, so time savings here come from size alone.
+"""
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from .fakes import FakeConfig
+from .harness import summarize
+
+
+def run(config: FakeConfig, bandwidth: float = 2_000_000, minutes=(5, 20, 60)) -> Dict:
+    """`config` is the installed FakeConfig; its audio settings are restored afterwards."""
+    from app.services import pipeline
+
+    results: Dict = {}
+    saved = (config.audio_bandwidth, config.audio_duration, pipeline.AUDIO_MODE, pipeline.AUDIO_MAX_BYTES)
+    config.audio_bandwidth = bandwidth
+    try:
+        # "best" with no size cap is the previous behaviour
+        for mode, max_bytes in (("best", 0), ("speech", saved[3])):
+            pipeline.AUDIO_MODE, pipeline.AUDIO_MAX_BYTES = mode, max_bytes
+            samples, sizes = [], []
+            for m in minutes:
+                config.audio_duration = m * 60.0
+                out = Path(tempfile.mkdtemp(prefix="mvp-bench-audio-"))
+                t0 = time.perf_counter()
+                path = pipeline.download_audio("https://www.youtube.com/watch?v=benchaudio1", dest_dir=out)
+                samples.append(time.perf_counter() - t0)
+                sizes.append(path.stat().st_size)
+                path.unlink()
+            results[f"download_{mode}"] = summarize(samples)
+            results[f"bytes_{mode}"] = {f"{m}min_mb": size / 1e6 for m, size in zip(minutes, sizes)}
+    finally:
+        config.audio_bandwidth, config.audio_duration, pipeline.AUDIO_MODE, pipeline.AUDIO_MAX_BYTES = saved
+    best, speech = results["bytes_best"], results["bytes_speech"]
+    results["saved_pct"] = {k: 100.0 * (1 - speech[k] / best[k]) for k in best}
+    return results
@@ -0,0 +1,63 @@
+"""Disk savings from compressed transcript/spec storage.
+
+The corpus is English prose from the stdlib's pydoc topics, cut into
+transcript-sized chunks (roughly 10–60 minutes of speech), each paired with a
+generated spec — closer to real Whisper output than the repetitive fake transcript.
+"""
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .harness import summarize
+
+
+def corpus(n: int = 200, seed: int = 7) -> List[str]:
+    from pydoc_data.topics import topics
+
+    words = " ".join(topics.values()).split()
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        length = rng.randint(1500, 9000)  # ~150 words per minute of speech
+        start = rng.randrange(0, max(1, len(words) - length))
+        chunk = words[start:start + length]
+        # Whisper emits sentence-ish lines rather than wrapped paragraphs
+        out.append("\n".join(" ".join(chunk[i:i + 14]) for i in range(0, len(chunk), 14)))
+    return out
+
+
+def run(n: int = 200) -> Dict:
+    import json
+
+    from app.services.pipeline import analyze_to_spec
+    from app.services.storage import LocalStorage
+
+    storage = LocalStorage(Path(tempfile.mkdtemp(prefix="mvp-bench-gz-")))
+    original = stored = 0
+    write_s: List[float] = []
+    read_s: List[float] = []
+    for i, transcript in enumerate(corpus(n), start=1):
+        spec = json.dumps(analyze_to_spec(transcript, f"Project {i}"), indent=2)
+        for name, text in (("transcript.txt", transcript), ("spec.json", spec)):
+            t0 = time.perf_counter()
+            path = storage.write_text(i, name, text, compress=True)
+            write_s.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            assert storage.read_text(path) == text
+            read_s.append(time.perf_counter() - t0)
+        for entry in storage.size_index(i).values():
+            original += entry["original_bytes"]
+            stored += entry["stored_bytes"]
+    return {
+        "disk": {
+            "projects": n,
+            "original_mb": original / 1e6,
+            "stored_mb": stored / 1e6,
+            "ratio": original / stored if stored else 0.0,
+            "saved_pct": 100.0 * (1 - stored / original) if original else 0.0,
+        },
+        "write_compressed": summarize(write_s),
+        "read_decompressed": summarize(read_s),
+    }
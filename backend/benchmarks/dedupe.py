@@ -0,0 +1,56 @@
+"""MinHash/LSH index cost: signature time per transcript, index memory and query latency.
+
+Index size is simulated with random signatures (computing real ones for 50k
+transcripts would dominate the run); query latency is measured with a
+planted near-duplicate so every query also scores at least one candidate.
+"""
+import random
+import time
+import tracemalloc
+from array import array
+from typing import Dict
+
+from .compression import corpus
+from .harness import summarize
+
+
+def run(entries: int = 50000, queries: int = 500) -> Dict:
+    from app.services import dedupe
+
+    texts = corpus(50)
+    sig_s = []
+    for text in texts:
+        t0 = time.perf_counter()
+        dedupe.minhash(text)
+        sig_s.append(time.perf_counter() - t0)
+
+    rng = random.Random(3)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    index = dedupe.MinHashIndex()
+    for pid in range(1, entries + 1):
+        index.add(pid, array("I", (rng.getrandbits(32) for _ in range(dedupe.NUM_PERM))))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    index_bytes = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    planted = dedupe.minhash(texts[0])
+    index.add(entries + 1, planted)
+    near = dedupe.minhash(" ".join(texts[0].split()[100:]))
+    query_s = []
+    for _ in range(queries):
+        t0 = time.perf_counter()
+        hits = index.query(near)
+        query_s.append(time.perf_counter() - t0)
+    assert hits and hits[0][0] == entries + 1
+
+    return {
+        "minhash_per_transcript": summarize(sig_s),
+        "index": {
+            "entries": entries,
+            "memory_mb": index_bytes / 1e6,
+            "bytes_per_entry": index_bytes / entries,
+            "stats_approx_mb": index.stats()["approx_bytes"] / 1e6,
+        },
+        "query": summarize(query_s),
+    }
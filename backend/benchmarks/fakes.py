@@ -0,0 +1,259 @@
+"""In-process fakes for the external services used by the pipeline.
+
+`install_fakes(config)` swaps YouTubeTranscriptApi, the timedtext HTTP endpoint,
+YoutubeDL and the OpenAI client for local doubles, so tests and benchmarks run
+offline and deterministically. Each service can be given a latency (seconds)
+and a failure rate (0..1) to exercise slow or flaky upstreams.
+"""
+import json
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+from unittest import mock
+
+SERVICES = ("captions", "timedtext", "youtube_dl", "openai")
+
+DEFAULT_TRANSCRIPT = (
+    "In this tutorial we will build a SaaS dashboard step by step. "
+    "Users sign up, go through onboarding and land on a dashboard with usage charts. "
+    "We add an API for integrations, a pricing page with three tiers and auth with magic links. "
+    "Then we launch the MVP and plan the roadmap based on feedback from the first users. "
+)
+
+
+# Audio-only formats YouTube typically offers: (format_id, ext, acodec, abr kbps)
+AUDIO_FORMATS = (
+    ("599", "m4a", "mp4a.40.5", 30.8),
+    ("600", "webm", "opus", 35.4),
+    ("139", "m4a", "mp4a.40.5", 48.8),
+    ("249", "webm", "opus", 50.1),
+    ("250", "webm", "opus", 65.6),
+    ("140", "m4a", "mp4a.40.2", 129.5),
+    ("251", "webm", "opus", 135.3),
+)
+
+
+class FakeServiceError(RuntimeError):
+    pass
+
+
+@dataclass
+class FakeConfig:
+    # "manual" | "generated" | "none": which caption track YouTubeTranscriptApi exposes
+    captions: str = "manual"
+    # Whether the timedtext HTTP endpoint returns captions when the API has none
+    timedtext: bool = False
+    # Enables the Whisper/GPT paths by exposing a fake OPENAI_API_KEY
+    openai: bool = False
+    transcript: str = DEFAULT_TRANSCRIPT * 20
+    # Length of every faked video; audio file sizes follow from the selected format's bitrate
+    audio_duration: float = 600.0
+    # Download throughput in bytes/s for the faked audio (0: instant)
+    audio_bandwidth: float = 0.0
+    # Entries returned when YoutubeDL flat-extracts a playlist
+    playlist_size: int = 5
+    latency: Dict[str, float] = field(default_factory=dict)
+    failure_rate: Dict[str, float] = field(default_factory=dict)
+    seed: int = 1234
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {s: 0 for s in SERVICES}
+        self.ydl_opts: Dict = {}  # options of the last YoutubeDL created
+
+    def hit(self, service: str) -> None:
+        """Account for one call: sleep for the configured latency, maybe fail."""
+        with self._lock:
+            self.calls[service] += 1
+            roll = self._rng.random()
+        delay = self.latency.get(service, 0.0)
+        if delay:
+            time.sleep(delay)
+        if roll < self.failure_rate.get(service, 0.0):
+            raise FakeServiceError(f"injected {service} failure")
+
+    def lines(self) -> List[str]:
+        words = self.transcript.split()
+        return [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+
+
+# --- youtube_transcript_api -------------------------------------------------
+
+class FakeTranscript:
+    def __init__(self, config: FakeConfig, language_code: str, is_generated: bool):
+        self.config = config
+        self.language_code = language_code
+        self.is_generated = is_generated
+
+    def fetch(self) -> List[Dict]:
+        self.config.hit("captions")
+        return [{"text": ln, "start": float(i), "duration": 1.0} for i, ln in enumerate(self.config.lines())]
+
+
+class FakeTranscriptList:
+    def __init__(self, transcripts: List[FakeTranscript]):
+        self._transcripts = transcripts
+
+    def __iter__(self):
+        return iter(self._transcripts)
+
+    def _find(self, langs, generated: bool) -> FakeTranscript:
+        from youtube_transcript_api import NoTranscriptFound
+
+        for t in self._transcripts:
+            if t.is_generated == generated and t.language_code in langs:
+                return t
+        raise NoTranscriptFound("fake", langs, self)
+
+    def find_manually_created_transcript(self, langs) -> FakeTranscript:
+        return self._find(langs, generated=False)
+
+    def find_generated_transcript(self, langs) -> FakeTranscript:
+        return self._find(langs, generated=True)
+
+
+def _fake_transcript_api(config: FakeConfig):
+    class FakeYouTubeTranscriptApi:
+        @staticmethod
+        def list_transcripts(video_id: str) -> FakeTranscriptList:
+            from youtube_transcript_api import TranscriptsDisabled
+
+            config.hit("captions")
+            if config.captions == "none":
+                raise TranscriptsDisabled(video_id)
+            return FakeTranscriptList([FakeTranscript(config, "en", config.captions == "generated")])
+
+    return FakeYouTubeTranscriptApi
+
+
+# --- timedtext endpoint (requests) -----------------------------------------
+
+def _fake_requests_get(config: FakeConfig):
+    def get(url: str, params=None, headers=None, timeout=None, **_):
+        config.hit("timedtext")
+        if not config.timedtext:
+            return SimpleNamespace(status_code=404, text="")
+        body = "".join(f'<text start="{i}" dur="1">{ln}</text>' for i, ln in enumerate(config.lines()))
+        return SimpleNamespace(status_code=200, text=f'<?xml version="1.0" encoding="utf-8" ?><transcript>{body}</transcript>')
+
+    return get
+
+
+# --- yt_dlp -----------------------------------------------------------------
+
+def _fake_youtube_dl(config: FakeConfig):
+    class FakeYoutubeDL:
+        def __init__(self, opts: Optional[Dict] = None):
+            self.opts = opts or {}
+            config.ydl_opts = self.opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def _select(self, formats: List[Dict]) -> Dict:
+            # Just the two selectors the pipeline uses; test_audio checks them against real yt-dlp
+            m = re.match(r"wa\[abr>=([\d.]+)\]", self.opts.get("format", ""))
+            above = [f for f in formats if m and f["abr"] >= float(m.group(1))]
+            if above:
+                return min(above, key=lambda f: f["abr"])
+            return max(formats, key=lambda f: f["abr"])
+
+        def extract_info(self, url: str, download: bool = True) -> Dict:
+            config.hit("youtube_dl")
+            if self.opts.get("extract_flat"):
+                entries = [
+                    {"id": f"fakevid{i:04d}", "url": f"https://www.youtube.com/watch?v=fakevid{i:04d}", "title": f"Fake video {i}"}
+                    for i in range(config.playlist_size)
+                ]
+                end = self.opts.get("playlistend")
+                return {"_type": "playlist", "id": "fakeplaylist", "entries": entries[:end] if end else entries}
+            formats = [
+                {"format_id": fid, "ext": ext, "abr": abr, "acodec": acodec, "vcodec": "none", "filesize": int(abr * 125 * config.audio_duration)}
+                for fid, ext, acodec, abr in AUDIO_FORMATS
+            ]
+            info = {"id": "fakevideo", "title": "Fake video", "duration": config.audio_duration, "formats": formats, **self._select(formats)}
+            return self.process_ie_result(info, download=True) if download else info
+
+        def process_ie_result(self, info: Dict, download: bool = True) -> Dict:
+            if not download:
+                return info
+            size = info["filesize"]
+            limit = self.opts.get("max_filesize")
+            if limit and size > limit:
+                return info  # yt-dlp skips the download rather than failing
+            if config.audio_bandwidth:
+                time.sleep(size / config.audio_bandwidth)
+            path = Path(self.opts.get("outtmpl", "audio.%(ext)s") % info)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "wb") as f:
+                f.truncate(size)  # sparse: sized like the real stream without writing it
+            return dict(info, requested_downloads=[{"filepath": str(path)}])
+
+    return FakeYoutubeDL
+
+
+# --- openai -----------------------------------------------------------------
+
+def _fake_openai(config: FakeConfig):
+    def transcribe(model: str, file, **_):
+        config.hit("openai")
+        return SimpleNamespace(text=config.transcript)
+
+    def chat(model: str, messages: List[Dict], **_):
+        config.hit("openai")
+        system = messages[0]["content"] if messages else ""
+        if "triage" in system:
+            data = {"mvp_viability": "mvp-ready", "viability_score": 0.82, "viability_reason": "Fake verdict."}
+        else:
+            data = {
+                "title": "Fake MVP",
+                "description": "Spec produced by the fake OpenAI client.",
+                "features": ["Auth", "Dashboard", "Pricing"],
+                "cta": {"label": "Start", "href": "/"},
+                "branding": {"primary": "#22c55e", "neutral": "#18181b"},
+                "sections": [],
+            }
+        message = SimpleNamespace(content=json.dumps(data))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    class FakeOpenAI:
+        def __init__(self, api_key: Optional[str] = None, **_):
+            self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=transcribe))
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=chat))
+
+    return FakeOpenAI
+
+
+@contextmanager
+def install_fakes(config: Optional[FakeConfig] = None) -> Iterator[FakeConfig]:
+    """Patch the pipeline's external services with fakes for the duration of the block.
+
+    The pipeline imports these lazily, so the patches go on the source modules.
+    """
+    import openai
+    import requests
+    import youtube_transcript_api
+    import yt_dlp
+
+    from app.services import viability
+
+    config = config or FakeConfig()
+    key = "sk-fake" if config.openai else ""
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(youtube_transcript_api, "YouTubeTranscriptApi", _fake_transcript_api(config)))
+        stack.enter_context(mock.patch.object(requests, "get", _fake_requests_get(config)))
+        stack.enter_context(mock.patch.object(yt_dlp, "YoutubeDL", _fake_youtube_dl(config)))
+        stack.enter_context(mock.patch.object(openai, "OpenAI", _fake_openai(config)))
+        stack.enter_context(mock.patch.object(viability, "OPENAI_API_KEY", key or None))
+        stack.enter_context(mock.patch.dict("os.environ", {"OPENAI_API_KEY": key}))
+        yield config
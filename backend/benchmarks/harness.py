@@ -0,0 +1,97 @@
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def isolate_env(workdir: Optional[Path] = None) -> Path:
+    """Point the app at a throwaway database and artifacts dir.
+
+    Must run before `app.*` is imported: the engine and ARTIFACTS_DIR are bound at
+    import time. Empty OPENAI_API_KEY keeps `.env` from enabling real API calls.
+    """
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="mvp-bench-"))
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["ARTIFACTS_DIR"] = str(workdir / "artifacts")
+    os.environ["OPENAI_API_KEY"] = ""
+    os.environ["YT_COOKIES_FILE"] = ""
+    # Load scenarios submit from a single client; keep admission control out of the way
+    os.environ.setdefault("RATE_LIMIT_FREE", "100000000,100000000")
+    os.environ.setdefault("MAX_PENDING_PIPELINES", "100000000")
+    return workdir
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    ms = [s * 1000.0 for s in samples]
+    return {
+        "n": len(ms),
+        "mean_ms": statistics.fmean(ms) if ms else 0.0,
+        "min_ms": min(ms) if ms else 0.0,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms) if ms else 0.0,
+    }
+
+
+def bench(fn: Callable[[], object], repeat: int = 50, warmup: int = 3) -> Dict[str, float]:
+    """Time `fn` `repeat` times after `warmup` untimed calls."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    out = summarize(samples)
+    out["ops_per_s"] = (1000.0 / out["mean_ms"]) if out["mean_ms"] else 0.0
+    return out
+
+
+def save_results(results: Dict, out: Optional[Path] = None) -> Path:
+    if out is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out = RESULTS_DIR / f"bench-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json"
+    payload = {
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return out
+
+
+def compare(current: Dict, baseline_path: Path, metric: str = "p50_ms", tolerance: float = 0.10) -> List[str]:
+    """Return human-readable lines for each benchmark; flag slowdowns above `tolerance`."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    lines = []
+    for suite, cases in current.items():
+        for name, stats in cases.items():
+            old = baseline.get(suite, {}).get(name, {}).get(metric)
+            new = stats.get(metric) if isinstance(stats, dict) else None
+            if old is None or new is None or not old:
+                continue
+            ratio = new / old
+            flag = "REGRESSION" if ratio > 1 + tolerance else ""
+            lines.append(f"{suite}.{name}: {metric} {old:.3f} -> {new:.3f} ({ratio:.2f}x) {flag}".rstrip())
+    return lines
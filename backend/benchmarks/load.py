@@ -0,0 +1,48 @@
+"""End-to-end load scenario against `/api/projects` with faked upstreams.
+
+Note: TestClient runs background tasks before returning, so POST latency here
+includes the full (faked) pipeline run — it measures end-to-end work per submission.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from .harness import summarize
+
+
+def run(requests: int = 200, concurrency: int = 8, read_ratio: float = 0.5) -> Dict:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    samples: Dict[str, List[float]] = {"POST /api/projects": [], "GET /api/projects": []}
+    errors = {"POST /api/projects": 0, "GET /api/projects": 0}
+    writes_every = max(1, round(1 / (1 - read_ratio))) if read_ratio < 1 else 0
+
+    with TestClient(app) as client:
+        def one(i: int) -> None:
+            if writes_every and i % writes_every == 0:
+                name = "POST /api/projects"
+                t0 = time.perf_counter()
+                resp = client.post("/api/projects", json={"youtube_url": f"https://www.youtube.com/watch?v=load{i:07d}"})
+            else:
+                name = "GET /api/projects"
+                t0 = time.perf_counter()
+                resp = client.get("/api/projects")
+            samples[name].append(time.perf_counter() - t0)
+            if resp.status_code >= 400:
+                errors[name] += 1
+
+        t_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(requests)))
+        elapsed = time.perf_counter() - t_start
+
+    results: Dict = {
+        "overall": {"requests": requests, "concurrency": concurrency, "elapsed_s": elapsed, "throughput_rps": requests / elapsed},
+    }
+    for name, s in samples.items():
+        stats = summarize(s)
+        stats["errors"] = errors[name]
+        results[name] = stats
+    return results
@@ -0,0 +1,78 @@
+"""Micro-benchmarks for CPU-bound helpers on the request and pipeline paths."""
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from .fakes import DEFAULT_TRANSCRIPT
+from .harness import bench
+
+
+def bench_viability(repeat: int) -> Dict:
+    from app.services.viability import naive_fallback_viability
+
+    short = DEFAULT_TRANSCRIPT
+    long = DEFAULT_TRANSCRIPT * 200
+    return {
+        "naive_fallback_viability_short": bench(lambda: naive_fallback_viability("Build a SaaS", short), repeat),
+        "naive_fallback_viability_long": bench(lambda: naive_fallback_viability("Build a SaaS", long), repeat),
+    }
+
+
+def bench_prototype_zip(repeat: int) -> Dict:
+    from app.services.pipeline import analyze_to_spec, generate_prototype_zip
+    from app.services.storage import LocalStorage
+
+    spec = analyze_to_spec(DEFAULT_TRANSCRIPT, "Bench MVP")
+    storage = LocalStorage(Path(tempfile.mkdtemp(prefix="mvp-bench-zip-")))
+    return {"generate_prototype_zip": bench(lambda: generate_prototype_zip(1, spec, storage), max(1, repeat // 5))}
+
+
+def bench_artifact_urls(repeat: int, artifacts_per_project: int = 20) -> Dict:
+    from sqlmodel import Session
+
+    from app.database import engine, init_db
+    from app.main import ARTIFACTS_DIR, project_artifacts_urls
+    from app.models import Artifact, Project
+
+    init_db()
+    with Session(engine) as session:
+        project = Project(youtube_url="https://www.youtube.com/watch?v=benchbench1", title="Bench")
+        session.add(project)
+        session.commit()
+        session.refresh(project)
+        base = ARTIFACTS_DIR / str(project.id)
+        project.transcript_path = str(base / "transcript.txt")
+        project.spec_path = str(base / "spec.json")
+        project.prototype_zip_path = str(base / "prototype.zip")
+        for i in range(artifacts_per_project):
+            session.add(Artifact(project_id=project.id, type="upload", path=str(base / f"upload-{i}.bin")))
+        session.add(project)
+        session.commit()
+        session.refresh(project)
+        return {
+            f"project_artifacts_urls_{artifacts_per_project}": bench(lambda: project_artifacts_urls(project, session), repeat),
+        }
+
+
+def bench_admission(repeat: int, clients: int = 5000) -> Dict:
+    from app.services.admission import AdmissionController
+
+    limiter = AdmissionController(limits={"free": (1e9, 1e9), "pro": (1e9, 1e9), "studio": (1e9, 1e9)}, max_pending=10**12)
+    keys = [f"ip:10.0.{i // 256}.{i % 256}" for i in range(clients)]
+    state = {"i": 0}
+
+    def admit_1000():
+        for _ in range(1000):
+            state["i"] += 1
+            limiter.admit(keys[state["i"] % clients])
+
+    return {"admission_admit_x1000": bench(admit_1000, repeat)}
+
+
+def run(repeat: int = 50) -> Dict:
+    results: Dict = {}
+    results.update(bench_viability(repeat))
+    results.update(bench_prototype_zip(repeat))
+    results.update(bench_artifact_urls(repeat))
+    results.update(bench_admission(repeat))
+    return results
@@ -0,0 +1,77 @@
+"""GET /api/projects/search latency over a seeded FTS5 index.
+
+Rows go in through `search.index_project` in commit-sized batches, the way the
+pipeline writes them (no final `optimize`). Transcripts are ~400-word slices of
+the pydoc-topics prose: shorter than real ones, so the index fits a laptop's
+disk at 100k rows, but with the same vocabulary skew, which is what drives
+posting-list length and query cost.
+"""
+import random
+import time
+from typing import Dict, List
+
+from .harness import summarize
+
+QUERIES = {
+    "rare_term": "quokkaledger",
+    "common_term": "function",
+    "two_terms": "invoicing dashboard",
+    "phrase_like": "return value of the function",
+}
+
+
+def seed(n_projects: int, words_per_doc: int = 400, batch: int = 1000) -> float:
+    from pydoc_data.topics import topics
+    from sqlmodel import Session
+
+    from app.database import engine, init_db
+    from app.models import Project
+    from app.services import search
+
+    init_db()
+    words = " ".join(topics.values()).split()
+    rng = random.Random(11)
+    t0 = time.perf_counter()
+    with Session(engine) as session:
+        for start in range(0, n_projects, batch):
+            projects = [
+                Project(youtube_url=f"https://www.youtube.com/watch?v=fts{i:08d}", title=f"Project {i}", status="complete")
+                for i in range(start, min(n_projects, start + batch))
+            ]
+            session.add_all(projects)
+            session.flush()
+            for p in projects:
+                at = rng.randrange(0, len(words) - words_per_doc)
+                text = " ".join(words[at:at + words_per_doc])
+                if p.id % 50 == 0:
+                    text += " an invoicing dashboard for freelancers"
+                if p.id % 20000 == 0:
+                    text += " quokkaledger"
+                search.index_project(session, p.id, p.title, text, {"title": p.title, "features": ["Export", "Search"]})
+            session.commit()
+    return time.perf_counter() - t0
+
+
+def run(n_projects: int = 100000, repeat: int = 50) -> Dict:
+    from sqlmodel import Session
+
+    from app.database import engine
+    from app.main import app
+    from app.services import search
+    from fastapi.testclient import TestClient
+
+    seed_s = seed(n_projects)
+    client = TestClient(app)
+    results: Dict = {"index": {"projects": n_projects, "seed_s": seed_s}}
+    with Session(engine) as session:
+        results["index"]["matches"] = {name: search.search(session, q, limit=1)[0] for name, q in QUERIES.items()}
+    for name, q in QUERIES.items():
+        for label, offset in (("", 0), ("_last_page", search.RANK_WINDOW - 20)):
+            samples: List[float] = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                res = client.get("/api/projects/search", params={"q": q, "limit": 20, "offset": offset})
+                samples.append(time.perf_counter() - t0)
+                assert res.status_code == 200
+            results[f"{name}{label}"] = summarize(samples)
+    return results
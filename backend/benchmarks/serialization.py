@@ -0,0 +1,105 @@
+"""GET /api/projects serialization cost: per-row ProjectRead + per-project artifact
+query (the original implementation, reproduced here) vs. the shared projection."""
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .harness import summarize
+
+
+def seed(n_projects: int, uploads_every: int = 10) -> None:
+    from sqlmodel import Session
+
+    from app.database import engine, init_db
+    from app.main import ARTIFACTS_DIR, storage
+    from app.models import Artifact, Project
+
+    init_db()
+    with Session(engine) as session:
+        projects = []
+        for i in range(n_projects):
+            base = ARTIFACTS_DIR / str(i + 1)
+            projects.append(Project(
+                youtube_url=f"https://www.youtube.com/watch?v=ser{i:08d}",
+                title=f"Project {i}",
+                status="complete",
+                mvp_viability="mvp-ready",
+                viability_score=0.7,
+                viability_reason="Contains product signals (features/how-to) with enough content.",
+                transcript_path=str(base / "transcript.txt"),
+                spec_path=str(base / "spec.json"),
+                prototype_zip_path=str(base / "prototype.zip"),
+            ))
+        session.add_all(projects)
+        session.flush()
+        for p in projects[::uploads_every]:
+            path = ARTIFACTS_DIR / str(p.id) / "notes.md"
+            session.add(Artifact(project_id=p.id, type="upload", path=str(path), rel_path=storage.relpath(path)))
+        session.commit()
+
+
+def legacy_app():
+    """The pre-projection list endpoint, mounted on a throwaway app."""
+    from fastapi import Depends, FastAPI
+    from sqlmodel import Session, select
+
+    from app.database import get_session
+    from app.main import ARTIFACTS_DIR, BACKEND_BASE_URL
+    from app.models import Artifact, Project
+    from app.schemas import ArtifactRead, ProjectRead
+
+    def project_artifacts_urls(project: Project, session: Session) -> List[ArtifactRead]:
+        results = session.exec(select(Artifact).where(Artifact.project_id == project.id)).all()
+        items: List[ArtifactRead] = []
+        for a in results:
+            rel = Path(a.path).relative_to(ARTIFACTS_DIR)
+            items.append(ArtifactRead(id=a.id, type=a.type, url=f"{BACKEND_BASE_URL}/downloads/{rel.as_posix()}", created_at=a.created_at))
+        implicit = [("transcript", project.transcript_path), ("spec", project.spec_path), ("prototype_zip", project.prototype_zip_path)]
+        for t, p in implicit:
+            if p:
+                rel = Path(p).relative_to(ARTIFACTS_DIR)
+                items.append(ArtifactRead(id=0, type=t, url=f"{BACKEND_BASE_URL}/downloads/{rel.as_posix()}", created_at=project.updated_at))
+        return items
+
+    legacy = FastAPI()
+
+    @legacy.get("/api/projects", response_model=List[ProjectRead])
+    def list_projects(session: Session = Depends(get_session)):
+        projects = session.exec(select(Project).order_by(Project.created_at.desc())).all()
+        return [
+            ProjectRead(
+                id=p.id, youtube_url=p.youtube_url, title=p.title, status=p.status,
+                mvp_viability=p.mvp_viability, viability_score=p.viability_score, viability_reason=p.viability_reason,
+                artifacts=project_artifacts_urls(p, session), created_at=p.created_at, updated_at=p.updated_at,
+            )
+            for p in projects
+        ]
+
+    return legacy
+
+
+def run(n_projects: int = 10000, repeat: int = 5) -> Dict:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    seed(n_projects)
+    results: Dict = {}
+    bodies = {}
+    for name, target in (("before", legacy_app()), ("after", app)):
+        client = TestClient(target)
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            resp = client.get("/api/projects")
+            samples.append(time.perf_counter() - t0)
+            assert resp.status_code == 200, resp.text
+        bodies[name] = resp.content
+        results[f"list_{n_projects}_{name}"] = summarize(samples)
+    # Same payload either way (modulo JSON formatting)
+    assert json.loads(bodies["before"]) == json.loads(bodies["after"])
+    before = results[f"list_{n_projects}_before"]["p50_ms"]
+    after = results[f"list_{n_projects}_after"]["p50_ms"]
+    results["speedup"] = {"p50_ratio": before / after if after else 0.0}
+    return results
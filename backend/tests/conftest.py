@@ -0,0 +1,25 @@
+import os
+import tempfile
+
+import pytest
+
+# Isolate the test run from the checked-in data.db, local artifacts and any real
+# API keys in .env; these are read when `app` is first imported.
+_workdir = tempfile.mkdtemp(prefix="mvp-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+os.environ["ARTIFACTS_DIR"] = os.path.join(_workdir, "artifacts")
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["YT_COOKIES_FILE"] = ""
+os.environ["RATE_LIMIT_FREE"] = "100000,100000"
+os.environ["ADMIN_TOKEN"] = "test-admin-token"
+
+
+@pytest.fixture(autouse=True, scope="session")
+def offline_services():
+    """Create the schema and serve YouTube, yt-dlp and OpenAI from in-process fakes."""
+    from app.database import init_db
+    from benchmarks.fakes import install_fakes
+
+    init_db()
+    with install_fakes() as config:
+        yield config
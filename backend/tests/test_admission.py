@@ -0,0 +1,80 @@
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from app.services.admission import AdmissionController
+
+
+client = TestClient(app)
+URL = "https://www.youtube.com/watch?v=admission01"
+
+
+def test_rate_limited_client_gets_429_with_retry_after(monkeypatch):
+    limiter = AdmissionController(limits={"free": (1 / 60, 2), "pro": (1, 10), "studio": (1, 50)}, max_pending=100)
+    monkeypatch.setattr(main.admission, "controller", limiter)
+    assert client.post("/api/projects", json={"youtube_url": URL}).status_code == 200
+    assert client.post("/api/projects", json={"youtube_url": URL}).status_code == 200
+    resp = client.post("/api/projects", json={"youtube_url": URL})
+    assert resp.status_code == 429
+    assert 1 <= int(resp.headers["Retry-After"]) <= 60
+    # Pipelines ran (TestClient runs background tasks), so their slots were released
+    assert limiter.pending == 0
+
+
+def test_plan_from_api_key_and_global_cap(monkeypatch):
+    limiter = AdmissionController(limits={"free": (0.0, 1), "pro": (0.0, 5), "studio": (0.0, 50)}, max_pending=3)
+    monkeypatch.setattr(main.admission, "API_KEY_PLANS", {"k-pro": "pro"})
+    monkeypatch.setattr(main.admission, "controller", limiter)
+    urls = [f"https://www.youtube.com/watch?v=admbulk{i:04d}" for i in range(4)]
+    # Above the free plan's burst entirely
+    assert client.post("/api/projects/bulk", json={"urls": urls}).status_code == 413
+    # Within the pro burst, but above the global cap of 3 pending pipelines
+    limiter.pending = 1
+    resp = client.post("/api/projects/bulk", json={"urls": urls[:3]}, headers={"X-API-Key": "k-pro"})
+    assert resp.status_code == 429
+    assert "Retry-After" in resp.headers
+    limiter.pending = 0
+    assert client.post("/api/projects/bulk", json={"urls": urls[:3]}, headers={"X-API-Key": "k-pro"}).status_code == 200
+
+
+def test_batch_larger_than_global_cap_is_413_not_429():
+    limiter = AdmissionController(limits={"free": (1.0, 100), "pro": (1.0, 100), "studio": (1.0, 100)}, max_pending=50)
+    try:
+        limiter.admit("ip:1", "free", cost=60)
+    except main.admission.Rejected as e:
+        assert e.status_code == 413
+    else:
+        raise AssertionError("expected a rejection")
+    assert limiter.pending == 0
+
+
+def test_failed_insert_releases_reserved_slots(monkeypatch):
+    limiter = AdmissionController(limits={"free": (1.0, 10), "pro": (1.0, 10), "studio": (1.0, 10)}, max_pending=100)
+    monkeypatch.setattr(main.admission, "controller", limiter)
+    monkeypatch.setattr(main, "Project", None)  # building the project rows raises TypeError
+    urls = [f"https://www.youtube.com/watch?v=admfail{i:04d}" for i in range(3)]
+    with TestClient(app, raise_server_exceptions=False) as failing:
+        assert failing.post("/api/projects/bulk", json={"urls": urls}).status_code == 500
+    assert limiter.pending == 0
+
+
+def test_spoofed_forwarded_for_does_not_pick_the_bucket(monkeypatch):
+    monkeypatch.setattr(main.admission, "TRUST_FORWARDED_FOR", True)
+    ids = {main.admission.identify({"x-forwarded-for": f"10.0.0.{i}, 203.0.113.7"}, "10.1.1.1")[0] for i in range(5)}
+    assert ids == {"ip:203.0.113.7"}
+    monkeypatch.setattr(main.admission, "TRUSTED_PROXY_HOPS", 2)
+    assert main.admission.identify({"x-forwarded-for": "1.2.3.4, 203.0.113.7, 10.0.0.2"}, None)[0] == "ip:203.0.113.7"
+    assert main.admission.identify({"x-forwarded-for": "203.0.113.7"}, None)[0] == "ip:203.0.113.7"
+
+
+def test_rate_limited_client_cannot_expand_playlists(offline_services, monkeypatch):
+    limiter = AdmissionController(limits={"free": (0.0, 1), "pro": (0.0, 5), "studio": (0.0, 50)}, max_pending=100)
+    monkeypatch.setattr(main.admission, "controller", limiter)
+    body = {"playlist_url": "https://www.youtube.com/playlist?list=PLlimited"}
+    # Five videos against a burst of one: expanded once, then rejected and the slot given back
+    assert client.post("/api/projects/bulk", json=body).status_code == 413
+    assert limiter.pending == 0
+    expansions = offline_services.calls["youtube_dl"]
+    resp = client.post("/api/projects/bulk", json=body)
+    assert resp.status_code == 429
+    assert offline_services.calls["youtube_dl"] == expansions
@@ -19,3 +19,32 @@ def test_create_and_list_projects():
     items = resp2.json()
     assert any(p["id"] == pid for p in items)
 
+
+
+def test_project_payloads_match_project_read_schema():
+    import json
+
+    from sqlmodel import Session
+
+    from app.database import engine
+    from app.main import storage
+    from app.models import Artifact
+    from app.schemas import ArtifactRead, ProjectRead
+
+    pid = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=schemacheck"}).json()["id"]
+    assert client.post(f"/api/projects/{pid}/artifacts", files={"file": ("notes.md", b"notes")}).status_code == 200
+    # Rows written before rel_path existed fall back to the stored path
+    legacy = storage.save_upload(pid, "legacy.txt", b"old")
+    with Session(engine) as session:
+        session.add(Artifact(project_id=pid, type="upload", path=str(legacy)))
+        session.commit()
+
+    listed = [p for p in client.get("/api/projects").json() if p["id"] == pid]
+    single = client.get(f"/api/projects/{pid}").json()
+    for payload in listed + [single]:
+        assert set(payload) == set(ProjectRead.model_fields)
+        assert all(set(a) == set(ArtifactRead.model_fields) for a in payload["artifacts"])
+        project = ProjectRead.model_validate_json(json.dumps(payload), strict=True)
+        urls = {a.url.split("/downloads/", 1)[1] for a in project.artifacts if a.type == "upload"}
+        assert urls == {f"{pid}/uploads/notes.md", f"{pid}/uploads/legacy.txt"}
+        assert {a.type for a in project.artifacts} >= {"upload", "transcript", "spec"}
@@ -0,0 +1,50 @@
+import importlib
+
+import pytest
+
+from app.services import pipeline
+from benchmarks.fakes import AUDIO_FORMATS
+
+
+def test_selector_picks_smallest_stream_above_floor_with_real_yt_dlp():
+    # install_fakes replaces yt_dlp.YoutubeDL; the submodule still holds the real class
+    RealYoutubeDL = importlib.import_module("yt_dlp.YoutubeDL").YoutubeDL
+    formats = [
+        {"format_id": fid, "ext": ext, "acodec": acodec, "vcodec": "none", "abr": abr, "url": f"https://example.invalid/{fid}", "filesize": int(abr * 125 * 600)}
+        for fid, ext, acodec, abr in AUDIO_FORMATS
+    ] + [{"format_id": "18", "ext": "mp4", "acodec": "mp4a.40.2", "vcodec": "avc1", "abr": 96, "height": 360, "url": "https://example.invalid/18"}]
+
+    def pick(selector):
+        ydl = RealYoutubeDL({"format": selector, "format_sort": ["abr"], "quiet": True, "simulate": True})
+        info = {"id": "x", "title": "x", "extractor": "youtube", "extractor_key": "Youtube", "webpage_url": "https://example.invalid", "formats": [dict(f) for f in formats]}
+        return ydl.process_ie_result(info, download=False)["format_id"]
+
+    assert pick(pipeline.audio_format_selector(32, 0)) == "600"
+    assert pick(pipeline.audio_format_selector(40, 0)) == "139"
+    assert pick(pipeline.audio_format_selector(500, 0)) == "251"  # nothing meets the floor: best audio
+    assert pick(pipeline.audio_format_selector(32, 2_000_000)) == "599"  # nothing both meets it and fits: smallest
+
+
+def test_download_audio_returns_exact_path_of_small_stream(offline_services, tmp_path):
+    path = pipeline.download_audio("https://www.youtube.com/watch?v=audio000001", dest_dir=tmp_path)
+    assert path == tmp_path / "audio.webm"
+    assert path.stat().st_size == int(35.4 * 125 * offline_services.audio_duration)
+    assert offline_services.ydl_opts["concurrent_fragment_downloads"] == pipeline.AUDIO_FRAGMENT_CONCURRENCY
+
+
+def test_best_mode_keeps_highest_bitrate(offline_services, tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "AUDIO_MODE", "best")
+    path = pipeline.download_audio("https://www.youtube.com/watch?v=audio000002", dest_dir=tmp_path)
+    assert path.stat().st_size == int(135.3 * 125 * offline_services.audio_duration)
+
+
+def test_duration_and_size_cutoffs(offline_services, tmp_path, monkeypatch):
+    monkeypatch.setattr(offline_services, "audio_duration", 5 * 3600)
+    with pytest.raises(pipeline.AudioRejected, match="AUDIO_MAX_DURATION"):
+        pipeline.download_audio("https://www.youtube.com/watch?v=audio000003", dest_dir=tmp_path)
+
+    monkeypatch.setattr(offline_services, "audio_duration", 600)
+    monkeypatch.setattr(pipeline, "AUDIO_MAX_BYTES", 1_000_000)
+    with pytest.raises(pipeline.AudioRejected, match="AUDIO_MAX_MB"):
+        pipeline.download_audio("https://www.youtube.com/watch?v=audio000004", dest_dir=tmp_path)
+    assert not list(tmp_path.iterdir())
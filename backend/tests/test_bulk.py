@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+from app.main import app
+
+
+client = TestClient(app)
+
+
+def test_bulk_dedupes_by_video_id_and_reports_batch_progress():
+    urls = [
+        "https://www.youtube.com/watch?v=bulkvid0001",
+        "https://youtu.be/bulkvid0001",
+        "https://www.youtube.com/watch?v=bulkvid0002&t=30",
+        "not a url",
+    ]
+    resp = client.post("/api/projects/bulk", json={"urls": urls})
+    assert resp.status_code == 200, resp.text
+    batch = resp.json()
+    assert batch["total"] == 2
+    assert batch["duplicates"] == 1
+    assert batch["invalid"] == ["not a url"]
+    assert len(batch["project_ids"]) == 2
+
+    # TestClient runs the background batch before returning
+    status = client.get(f"/api/batches/{batch['id']}").json()
+    assert status["status"] == "complete"
+    assert status["progress"] == 1.0
+    assert sum(status["counts"].values()) == 2
+
+
+def test_bulk_expands_playlist(offline_services):
+    resp = client.post("/api/projects/bulk", json={"playlist_url": "https://www.youtube.com/playlist?list=PLfake"})
+    assert resp.status_code == 200, resp.text
+    batch = resp.json()
+    assert batch["total"] == offline_services.playlist_size
+    assert batch["source"].endswith("PLfake")
+
+
+def test_bulk_rejects_empty_batch():
+    resp = client.post("/api/projects/bulk", json={"urls": ["nope"]})
+    assert resp.status_code == 400
+
+
+def test_bulk_rejects_playlist_longer_than_cap(offline_services, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "BULK_MAX_ITEMS", offline_services.playlist_size - 1)
+    resp = client.post("/api/projects/bulk", json={"playlist_url": "https://www.youtube.com/playlist?list=PLlong"})
+    assert resp.status_code == 413
+    monkeypatch.setattr(main, "BULK_MAX_ITEMS", offline_services.playlist_size)
+    assert client.post("/api/projects/bulk", json={"playlist_url": "https://www.youtube.com/playlist?list=PLlong"}).status_code == 200
@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.database import engine
+from app.main import app, storage
+from app.models import Project
+
+
+def test_transcript_stored_compressed_and_served_transparently():
+    with TestClient(app) as client:
+        pid = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=compress001"}).json()["id"]
+        with Session(engine) as session:
+            project = session.get(Project, pid)
+        assert project.transcript_path.endswith("transcript.txt.gz")
+        transcript = storage.read_text(project.transcript_path)
+        index = storage.size_index(pid)["transcript.txt"]
+        assert index["original_bytes"] == len(transcript.encode("utf-8")) > index["stored_bytes"]
+
+        url = next(a["url"] for a in client.get(f"/api/projects/{pid}").json()["artifacts"] if a["type"] == "transcript")
+        path = url.split("/downloads", 1)[1]
+        assert path.endswith("/transcript.txt")
+
+        gz = client.get("/downloads" + path, headers={"Accept-Encoding": "gzip"})
+        assert gz.status_code == 200
+        assert gz.headers["content-encoding"] == "gzip"
+        assert gz.text == transcript
+
+        plain = client.get("/downloads" + path, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.text == transcript
+
+        # q=0 refuses gzip; both encodings carry their own validators and honour them
+        refused = client.get("/downloads" + path, headers={"Accept-Encoding": "gzip;q=0, identity"})
+        assert "content-encoding" not in refused.headers
+        assert refused.text == transcript
+        assert refused.headers["last-modified"] == gz.headers["last-modified"]
+        assert refused.headers["etag"] != gz.headers["etag"]
+        for resp, encoding in ((refused, "identity"), (gz, "gzip")):
+            again = client.get("/downloads" + path, headers={"Accept-Encoding": encoding, "If-None-Match": resp.headers["etag"]})
+            assert again.status_code == 304
+
+
+def test_json_listing_is_gzipped():
+    with TestClient(app) as client:
+        resp = client.get("/api/projects", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers.get("content-encoding") == "gzip"
@@ -0,0 +1,89 @@
+import random
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.database import engine
+from app.main import app, storage
+from app.models import Project
+from app.services import dedupe, viability
+
+
+client = TestClient(app)
+
+
+def _text(seed: int, words: int = 1200) -> str:
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(3000)]
+    return " ".join(rng.choice(vocab) for _ in range(words))
+
+
+def test_minhash_separates_near_duplicates_from_unrelated_text():
+    base = _text(1)
+    clipped = " ".join(base.split()[60:])  # first ~5% cut off
+    sig = dedupe.minhash(base)
+    assert dedupe.similarity(sig, dedupe.minhash(clipped)) >= 0.85
+    assert dedupe.similarity(sig, dedupe.minhash(_text(2))) < 0.2
+
+    idx = dedupe.MinHashIndex()
+    idx.add(1, sig)
+    idx.add(2, dedupe.minhash(_text(2)))
+    assert [pid for pid, _ in idx.query(dedupe.minhash(clipped))] == [1]
+
+
+def test_near_duplicate_reuses_verdict_and_spec(offline_services, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-fake")
+    monkeypatch.setattr(viability, "OPENAI_API_KEY", "sk-fake")
+    original = "we will build a dashboard with pricing and onboarding " + _text(3)
+    monkeypatch.setattr(offline_services, "transcript", original)
+    first = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=dedupeorig1"}).json()["id"]
+
+    calls = offline_services.calls["openai"]
+    monkeypatch.setattr(offline_services, "transcript", " ".join(original.split()[40:]))
+    second = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=dedupeclip1"}).json()["id"]
+    assert offline_services.calls["openai"] == calls  # no viability/spec LLM calls
+
+    with Session(engine) as session:
+        a, b = session.get(Project, first), session.get(Project, second)
+        assert b.mvp_viability == a.mvp_viability and b.viability_score == a.viability_score
+        assert storage.read_text(b.spec_path) == storage.read_text(a.spec_path)
+
+
+def test_stub_transcripts_are_never_matched(offline_services, monkeypatch):
+    # Two stubs share most of their text, well above any sensible threshold
+    monkeypatch.setattr(offline_services, "captions", "none")
+    monkeypatch.setattr(dedupe, "DEDUPE_THRESHOLD", 0.5)
+    ids = [client.post("/api/projects", json={"youtube_url": f"https://www.youtube.com/watch?v=dedupestub{i}"}).json()["id"] for i in range(2)]
+    with Session(engine) as session:
+        stub = storage.read_text(session.get(Project, ids[1]).transcript_path)
+        assert dedupe.find_duplicate(session, ids[1], stub) == (None, 0.0, None)
+        assert all(session.get(dedupe.TranscriptSignature, pid) is None for pid in ids)
+
+
+def test_zip_is_reused_only_with_the_spec(offline_services, monkeypatch):
+    import io
+    import json
+    import zipfile
+
+    from app import main
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-fake")
+    monkeypatch.setattr(viability, "OPENAI_API_KEY", "sk-fake")
+    monkeypatch.setattr(main, "DEDUPE_REUSE_ZIP", True)
+    original = "we will build a dashboard with pricing and onboarding " + _text(4)
+    monkeypatch.setattr(offline_services, "transcript", original)
+    first = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=dedupezip01"}).json()["id"]
+    with Session(engine) as session:
+        source = session.get(Project, first)
+        assert source.prototype_zip_path
+        source.spec_path = None  # the spec can't be reused, so neither can the zip
+        session.add(source)
+        session.commit()
+
+    monkeypatch.setattr(offline_services, "transcript", " ".join(original.split()[40:]))
+    second = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=dedupezip02"}).json()["id"]
+    with Session(engine) as session:
+        project = session.get(Project, second)
+        spec = json.loads(storage.read_text(project.spec_path))
+        with zipfile.ZipFile(io.BytesIO(storage.read_bytes(project.prototype_zip_path))) as zf:
+            assert json.loads(zf.read("public/spec.json")) == spec
@@ -0,0 +1,76 @@
+import json
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import pipeline_log
+from app.services.pipeline_log import PipelineLogger, read_tail
+
+
+client = TestClient(app)
+
+
+def test_logger_buffers_and_writes_json_lines(tmp_path):
+    logger = PipelineLogger(tmp_path, project_id=7)
+    logger.bind("captions")("hello", video_id="abc")
+    assert not (tmp_path / "pipeline.log").exists()
+    logger.flush()
+    lines = (tmp_path / "pipeline.log").read_text().splitlines()
+    entry = json.loads(lines[0])
+    assert entry["msg"] == "hello"
+    assert entry["stage"] == "captions"
+    assert entry["project_id"] == 7
+    assert entry["video_id"] == "abc"
+
+
+def test_logger_rotates_at_size_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_log, "LOG_MAX_BYTES", 200)
+    logger = PipelineLogger(tmp_path)
+    for i in range(10):
+        logger(f"message {i}")
+        logger.flush()
+    assert (tmp_path / "pipeline.log.1").exists()
+    assert (tmp_path / "pipeline.log").stat().st_size <= 200
+    assert read_tail(tmp_path / "pipeline.log", 1)[0]["msg"] == "message 9"
+
+
+def test_project_logs_endpoint():
+    resp = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"})
+    pid = resp.json()["id"]
+    resp2 = client.get(f"/api/projects/{pid}/logs", params={"tail": 50})
+    assert resp2.status_code == 200
+    entries = resp2.json()
+    assert any(e.get("msg") == "Pipeline complete" for e in entries)
+
+    # Project is complete, so following returns the tail and ends
+    resp3 = client.get(f"/api/projects/{pid}/logs", params={"follow": 1})
+    assert resp3.status_code == 200
+    streamed = [json.loads(ln) for ln in resp3.text.splitlines()]
+    assert streamed[-1]["msg"] == "Pipeline complete"
+
+
+def test_follow_is_capped_and_releases_its_slot(monkeypatch):
+    import threading
+    from app import main
+
+    pid = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=logfollow01"}).json()["id"]
+    monkeypatch.setattr(main, "_log_followers", threading.BoundedSemaphore(1))
+    assert client.get(f"/api/projects/{pid}/logs", params={"follow": 1}).status_code == 200
+    # The finished stream gave its slot back; with it taken, followers are turned away
+    assert main._log_followers.acquire(blocking=False)
+    resp = client.get(f"/api/projects/{pid}/logs", params={"follow": 1})
+    assert resp.status_code == 503 and resp.headers["Retry-After"]
+    main._log_followers.release()
+
+
+def test_write_errors_keep_entries_and_do_not_raise(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_log, "LOG_BUFFER_LINES", 2)
+    blocked = tmp_path / "project"
+    blocked.write_text("not a directory")
+    logger = PipelineLogger(blocked)
+    for i in range(5):
+        logger(f"message {i}")  # fills the buffer; the failed flush must not raise
+    assert logger.flush() is False
+
+    blocked.unlink()
+    assert logger.flush() is True
+    assert [e["msg"] for e in read_tail(blocked / "pipeline.log", 10)] == [f"message {i}" for i in range(5)]
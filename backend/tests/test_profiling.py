@@ -0,0 +1,78 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import profiling
+
+
+client = TestClient(app)
+ADMIN = {"X-Admin-Token": "test-admin-token"}
+
+
+def test_admin_header_profiles_request_into_project_dir(offline_services, monkeypatch):
+    monkeypatch.setitem(offline_services.latency, "captions", 0.05)
+    pid = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=profile0001"}).json()["id"]
+
+    res = client.get(f"/api/projects/{pid}", headers={"X-Profile": "1", **ADMIN})
+    assert res.status_code == 200
+    name = res.headers["x-profile-id"]
+    listed = client.get("/api/admin/profiles", params={"project_id": pid}, headers=ADMIN).json()
+    assert [p["name"] for p in listed] == [name]
+
+    # A profiled POST also covers its background pipeline (captions sleep for 50ms)
+    res = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=profile0002"}, headers={"X-Profile": "1", **ADMIN})
+    folded = client.get(f"/api/admin/profiles/{res.headers['x-profile-id']}", headers=ADMIN)
+    assert folded.status_code == 200
+    lines = folded.text.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_run_stages" in line for line in lines)
+
+    # Profiles are admin-only: not under /downloads, not without the token
+    assert client.get(f"/downloads/{pid}/profiles/{name}").status_code == 404
+    assert client.get("/api/admin/profiles", params={"project_id": pid}, headers={"X-Admin-Token": "nope"}).status_code == 403
+    res = client.get(f"/api/projects/{pid}", headers={"X-Profile": "1", "X-Admin-Token": "nope"})
+    assert "x-profile-id" not in res.headers
+
+
+def test_sampled_pipeline_runs_write_speedscope(offline_services, monkeypatch):
+    monkeypatch.setitem(offline_services.latency, "captions", 0.05)
+    monkeypatch.setattr(profiling, "PROFILE_PIPELINE_RATE", 1.0)
+    monkeypatch.setattr(profiling, "PROFILE_FORMAT", "speedscope")
+    pid = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=profile0003"}).json()["id"]
+
+    listed = client.get("/api/admin/profiles", params={"project_id": pid}, headers=ADMIN).json()
+    assert len(listed) == 1 and "pipeline" in listed[0]["name"]
+    doc = json.loads(client.get(listed[0]["url"], headers=ADMIN).text)
+    assert doc["profiles"][0]["type"] == "sampled"
+    frames = [f["name"] for f in doc["shared"]["frames"]]
+    assert any(name.startswith("captions_or_transcribe ") for name in frames)
+
+
+def test_admin_endpoints_hidden_when_disabled(monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "")
+    assert client.get("/api/admin/profiles", headers=ADMIN).status_code == 404
+
+
+def test_request_profile_leaves_out_unrelated_threads():
+    import threading
+    import time
+
+    stop = threading.Event()
+
+    def unrelated_busy_loop():
+        while not stop.is_set():
+            sum(range(1000))
+
+    pid = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=profile0004"}).json()["id"]
+    worker = threading.Thread(target=unrelated_busy_loop, name="unrelated")
+    worker.start()
+    try:
+        time.sleep(0.02)
+        res = client.post("/api/projects", json={"youtube_url": "https://www.youtube.com/watch?v=profile0005"}, headers={"X-Profile": "1", **ADMIN})
+    finally:
+        stop.set()
+        worker.join()
+    folded = client.get(f"/api/admin/profiles/{res.headers['x-profile-id']}", headers=ADMIN).text
+    assert "unrelated_busy_loop" not in folded
+    assert "create_project" in folded or "_run_stages" in folded
@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.database import engine
+from app.main import app, storage
+from app.services import search
+
+
+client = TestClient(app)
+
+
+def _submit(offline_services, monkeypatch, video_id: str, transcript: str, title=None) -> int:
+    monkeypatch.setattr(offline_services, "transcript", transcript)
+    body = {"youtube_url": f"https://www.youtube.com/watch?v={video_id}"}
+    if title:
+        body["title"] = title
+    return client.post("/api/projects", json=body).json()["id"]
+
+
+def test_pipeline_indexes_transcripts_and_search_ranks_and_pages(offline_services, monkeypatch):
+    filler = " ".join(f"filler{i}" for i in range(300))
+    titled = _submit(offline_services, monkeypatch, "searchzeta1", f"{filler} a quokkaledger sync", title="Quokkaledger invoicing")
+    ids = [_submit(offline_services, monkeypatch, f"searchzet{i:02d}", f"{filler} quokkaledger dashboards {i}") for i in range(4)]
+
+    res = client.get("/api/projects/search", params={"q": "quokkaledger", "limit": 2})
+    assert res.status_code == 200
+    data = res.json()
+    assert data["total"] == 5
+    assert [hit["id"] for hit in data["results"]][0] == titled  # title matches weigh more
+    assert len(data["results"]) == 2
+    assert "<mark>quokkaledger</mark>" in data["results"][1]["snippet"].lower()
+
+    rest = client.get("/api/projects/search", params={"q": "quokkaledger", "limit": 2, "offset": 2}).json()["results"]
+    rest += client.get("/api/projects/search", params={"q": "quokkaledger", "limit": 2, "offset": 4}).json()["results"]
+    assert {hit["id"] for hit in data["results"] + rest} == {titled, *ids}
+
+    # Every word must match; stems match too ("dashboard" finds "dashboards")
+    both = client.get("/api/projects/search", params={"q": "Quokkaledger dashboard"}).json()
+    assert {hit["id"] for hit in both["results"]} == set(ids)
+
+
+def test_query_syntax_is_not_interpreted():
+    for q in ['"unbalanced', "NEAR(a b", "col:thing*", "-", "AND OR NOT"]:
+        assert client.get("/api/projects/search", params={"q": q}).status_code == 200
+    assert client.get("/api/projects/search", params={"q": ""}).status_code == 422
+
+
+def test_rebuild_reindexes_from_stored_artifacts(offline_services, monkeypatch):
+    pid = _submit(offline_services, monkeypatch, "searchrebld", "the wallabyplanner keeps recipes in sync " * 20)
+    with Session(engine) as session:
+        session.connection().exec_driver_sql(f"DELETE FROM {search.FTS_TABLE}")
+        session.commit()
+        assert search.search(session, "wallabyplanner") == (0, [])
+        assert search.rebuild(session, storage) >= 1
+        total, hits = search.search(session, "wallabyplanner")
+    assert total == 1 and hits[0]["id"] == pid
+
+
+def test_common_terms_rank_a_window_and_cap_the_count(offline_services, monkeypatch):
+    ids = [_submit(offline_services, monkeypatch, f"searchwin{i:02d}", f"numbatpayroll export run {i}") for i in range(5)]
+    monkeypatch.setattr(search, "RANK_WINDOW", 2)
+    monkeypatch.setattr(search, "COUNT_LIMIT", 4)
+    data = client.get("/api/projects/search", params={"q": "numbatpayroll", "limit": 2}).json()
+    assert data["total"] == 4 and data["total_capped"]
+    assert {hit["id"] for hit in data["results"]} == set(ids[-2:])  # newest matches only
+
+
+def test_pages_within_the_window_do_not_overlap_and_offsets_past_it_are_rejected(offline_services, monkeypatch):
+    ids = [_submit(offline_services, monkeypatch, f"searchpg{i:03d}", f"bilbyrota shift {'bilbyrota ' * i}") for i in range(6)]
+    monkeypatch.setattr(search, "RANK_WINDOW", 4)
+    pages = [client.get("/api/projects/search", params={"q": "bilbyrota", "limit": 2, "offset": o}).json()["results"] for o in (0, 2)]
+    seen = [hit["id"] for page in pages for hit in page]
+    assert len(seen) == len(set(seen)) == 4 and set(seen) <= set(ids)
+    assert client.get("/api/projects/search", params={"q": "bilbyrota", "offset": 4}).status_code == 400
+
+
+def test_snippets_escape_transcript_html(offline_services, monkeypatch):
+    _submit(offline_services, monkeypatch, "searchxss01", 'the <script>alert("x")</script> potorooplanner & more')
+    snippet = client.get("/api/projects/search", params={"q": "potorooplanner"}).json()["results"][0]["snippet"]
+    assert "<script>" not in snippet and "&lt;script&gt;" in snippet
+    assert "<mark>potorooplanner</mark> &amp; more" in snippet
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.services.pipeline import HEAVY_MODULES
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# Cumulative `-X importtime` of app.main; generous to absorb slow CI machines
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+
+def _importtime(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path}/startup.db", ARTIFACTS_DIR=str(tmp_path / "artifacts"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1000.0
+    return modules
+
+
+def test_startup_skips_heavy_imports_and_meets_budget(tmp_path):
+    modules = _importtime(tmp_path)
+    assert "app.main" in modules
+    loaded = set(HEAVY_MODULES + ("stripe",)) & set(modules)
+    assert not loaded, f"heavy modules imported at startup: {sorted(loaded)}"
+    assert modules["app.main"] < STARTUP_BUDGET_MS, f"app.main import took {modules['app.main']:.0f}ms"
@@ -0,0 +1,124 @@
+import os
+import time
+from datetime import timedelta
+
+from sqlmodel import Session
+
+from app.database import engine
+from app.models import Artifact, Project
+from app.services.storage import LocalStorage, collect_garbage, enforce_quota, parse_retention
+
+
+def _project(session, status="complete"):
+    p = Project(youtube_url="https://www.youtube.com/watch?v=storage0001", status=status)
+    session.add(p)
+    session.commit()
+    session.refresh(p)
+    return p
+
+
+def test_parse_retention_overrides_defaults():
+    policy = parse_retention("log=7d,prototype_zip=12h,upload=none")
+    assert policy["log"] == timedelta(days=7)
+    assert policy["prototype_zip"] == timedelta(hours=12)
+    assert policy["upload"] is None
+    assert policy["audio"] == timedelta(0)
+
+
+def test_gc_removes_orphans_expired_audio_and_dangling_refs(tmp_path):
+    storage = LocalStorage(tmp_path)
+    with Session(engine) as session:
+        project = _project(session)
+        transcript = storage.write_text(project.id, "transcript.txt", "hello")
+        audio = storage.save(project.id, "audio.webm", b"\0" * 10)
+        missing = storage.project_dir(project.id) / "gone.bin"
+        session.add(Artifact(project_id=project.id, type="upload", path=str(missing)))
+        project.transcript_path = str(transcript)
+        project.spec_path = str(storage.project_dir(project.id) / "spec.json")
+        session.add(project)
+        session.commit()
+        deleted = _project(session)
+        orphan = storage.save(deleted.id, "transcript.txt", b"orphan")
+        session.delete(deleted)
+        _project(session)  # a newer project, so the deleted id is below the highest one
+        # Ids the database has never handed out (another database's artifacts) are kept
+        foreign = storage.save(999999, "transcript.txt", b"foreign")
+
+        stats = collect_garbage(storage, session)
+        session.refresh(project)
+
+    assert not audio.exists()
+    assert transcript.exists()
+    assert not orphan.parent.exists()
+    assert foreign.exists()
+    assert project.spec_path is None
+    assert project.transcript_path == str(transcript)
+    assert stats["orphan_dirs"] == 1 and stats["orphan_dirs_kept"] == 1
+    assert stats["expired"] == 1 and stats["dangling_refs"] == 2
+
+
+def test_quota_evicts_least_recently_used_zip(tmp_path):
+    storage = LocalStorage(tmp_path, quota_bytes=150)
+    with Session(engine) as session:
+        old, new = _project(session), _project(session)
+        old_zip = storage.save(old.id, "prototype.zip", b"\0" * 100)
+        new_zip = storage.save(new.id, "prototype.zip", b"\0" * 100)
+        past = time.time() - 3600
+        os.utime(old_zip, (past, past))
+        old.prototype_zip_path = str(old_zip)
+        session.add(old)
+        session.commit()
+
+        evicted = enforce_quota(storage, session)
+        session.refresh(old)
+
+    assert evicted == [old_zip]
+    assert new_zip.exists()
+    assert old.prototype_zip_path is None
+
+
+def test_uploads_are_kept_apart_from_pipeline_files(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from app.main import app, storage as app_storage
+
+    client = TestClient(app)
+    with Session(engine) as session:
+        project = _project(session)
+    url = f"/api/projects/{project.id}/artifacts"
+    for name in ("audio.mp3", "index.json", "prototype.zip", "pipeline.log.1", "transcript.txt", "profiles", "..", ".hidden"):
+        assert client.post(url, files={"file": (name, b"x")}).status_code == 400, name
+
+    res = client.post(url, files={"file": ("notes.md", b"user data")})
+    assert res.status_code == 200
+    assert res.json()["url"].endswith(f"/{project.id}/uploads/notes.md")
+    with Session(engine) as session:
+        collect_garbage(app_storage, session)
+    assert (app_storage.project_dir(project.id) / "uploads" / "notes.md").read_bytes() == b"user data"
+
+
+def test_usage_is_tracked_without_walking_and_unattached_zips_expire(tmp_path, monkeypatch):
+    from app.services import storage as storage_mod
+
+    storage = LocalStorage(tmp_path, quota_bytes=1000)
+    with Session(engine) as session:
+        project = _project(session)
+        storage.save(project.id, "prototype.zip", b"\0" * 100)
+        assert storage.usage() == 100
+        # Below quota, uploads and pipeline runs don't walk the tree
+        monkeypatch.setattr(LocalStorage, "entries", lambda self: (_ for _ in ()).throw(AssertionError("walked")))
+        storage.save(project.id, "prototype.zip", b"\0" * 300)
+        storage.save_upload(project.id, "notes.md", b"\0" * 50)
+        assert storage.usage() == 350
+        assert enforce_quota(storage, session) == []
+        monkeypatch.undo()
+
+        fresh = storage.save(storage_mod.UNATTACHED_ID, "prototype.zip", b"zip")
+        stale = storage.save(storage_mod.UNATTACHED_ID, "old.zip", b"zip")
+        past = time.time() - 8 * 86400
+        os.utime(stale, (past, past))
+        stats = collect_garbage(storage, session)
+
+    assert fresh.exists() and not stale.exists()
+    assert stats["orphan_dirs"] == 0 and stats["expired"] == 1
+    assert storage.usage() == storage.usage(refresh=True)